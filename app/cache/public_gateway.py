@@ -1,3 +1,4 @@
+import itertools
 import json
 import logging
 import re
@@ -5,9 +6,33 @@ import time
 
 from bs4 import BeautifulSoup
 
+from django.conf import settings
+
+from app.search.models import StagingDataResponseModel
+from app.search.utils.cache import bump_dataset_generation
 from app.search.utils.date import convert_date_string_to_obj
-from app.search.utils.documents import insert_or_update_document  # noqa: E501
-from app.search.utils.retrieve_data import get_data_from_url
+from app.search.utils.documents import (
+    apply_document_changes,
+    content_hash,
+    diff_documents,
+    get_content_hashes,
+    get_display_fields,
+    get_document_type_group,
+    ingest_error,
+    insert_documents,
+    label_document_type,
+    normalise_document_type,
+    normalise_publisher_id,
+    refresh_catalogues,
+    update_search_vectors,
+)
+from app.search.utils.retrieve_data import get_data_from_url, iter_json_array
+from app.search.utils.snapshot import GatewaySnapshot
+from app.search.utils.staging import (
+    copy_live_documents,
+    create_staging_table,
+    swap_staging_table,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -116,121 +141,238 @@ def rectify_malformed_json_to_list(input_string):
     return result
 
 
-class PublicGateway:
-    def __init__(self):
-        """
-        Initializes the API client with the base URL for the Trade Data API.
+def _prepare_document(row):
+    """
+    Converts a row from the public gateway into the fields of a
+    DataResponseModel.
 
-        Attributes:
-            base_url (str): The base URL of the Trade Data API.
-        """
-        self._base_url = (
-            "https://data.api.trade.gov.uk/v1/datasets/uk-business-regulations"
-            "/versions/latest/data"
-        )
+    Args:
+        row (dict): A document from the public gateway, changed in place.
 
-    def build_cache(self, config):
-        logger.info("fetching all data from public gateway...")
+    Returns:
+        dict: The document's fields.
+    """
+    # Unnormalized date fields
+    row["source_date_issued"] = row.get("date_issued")
 
-        # URL encode the query for the API request
-        params = {"format": "json"}
+    row["source_date_modified"] = row.get("date_modified")
 
-        # Start time
-        start_time = time.time()
+    row["source_date_valid"] = row.get("date_valid")
 
-        data = get_data_from_url(
-            config, self._base_url, "exception raised fetching", params
-        )
-        inserted_document_count = 1
+    # Normalize the date fields
+    row["date_issued"] = convert_date_string_to_obj(row.get("date_issued"))
+    row["date_modified"] = convert_date_string_to_obj(row.get("date_modified"))
+    row["date_valid"] = convert_date_string_to_obj(row.get("date_valid"))
 
-        # End time
-        end_time = time.time()
-        initial_request_system_time = end_time - start_time
+    row["sort_date"] = row["date_valid"]
 
-        logger.debug(
-            f"fetching all data from public gateway took "
-            f"{initial_request_system_time} seconds"
-        )
+    row["id"] = row.get("uuid", "")
 
-        # Check if the request was successful
-        if data:
-            data = json.loads(data)
+    # Remove uuid from row
+    row.pop("uuid", None)
 
-            # Now you can use `data` as a usual Python dictionary
-            # Convert each row into DataResponseModel object
-            total_documents = len(data.get("uk_legislation_pdg"))
+    row["publisher_id"] = normalise_publisher_id(row["publisher"])
 
-            for row in data.get("uk_legislation_pdg"):
-                # Start time
-                start_time = time.time()
+    # Normalised, indexed document type filter columns and the display label
+    row["type_key"] = normalise_document_type(row.get("type"))
+    row["type_group"] = get_document_type_group(row.get("type"))
+    row["type_label"] = label_document_type(row.get("type"))
 
-                logger.info(
-                    f"inserting or updating document "
-                    f"{inserted_document_count} / ({total_documents})..."
-                )
+    corrected_related_legislation = rectify_malformed_json_to_list(
+        row.get("related_legislation_dict")
+    )
+    corrected_related_legislation_json = json.dumps(
+        corrected_related_legislation
+    )
+    row["related_legislation"] = corrected_related_legislation_json
 
-                # Unnormalized date fields
-                row["source_date_issued"] = row.get("date_issued")
+    # Remove related_legislation_dict from row
+    row.pop("related_legislation_dict", None)
 
-                row["source_date_modified"] = row.get("date_modified")
+    # Ready to render display fields
+    row.update(get_display_fields(row, corrected_related_legislation))
 
-                row["source_date_valid"] = row.get("date_valid")
+    # Compared with the stored hash to find changed documents
+    row["content_hash"] = content_hash(row)
+    return row
 
-                # Normalize the date fields
-                row["date_issued"] = convert_date_string_to_obj(
-                    row.get("date_issued")
-                )
-                row["date_modified"] = convert_date_string_to_obj(
-                    row.get("date_modified")
-                )
-                row["date_valid"] = convert_date_string_to_obj(
-                    row.get("date_valid")
-                )
 
-                row["sort_date"] = row["date_valid"]
+class PublicGateway:
+    def __init__(self):
+        """
+        Initializes the API client with the base URL for the Trade Data API.
 
-                row["id"] = row.get("uuid", "")
+        Attributes:
+            base_url (str): The base URL of the Trade Data API.
+        """
+        self._base_url = (
+            "https://data.api.trade.gov.uk/v1/datasets/uk-business-regulations"
+            "/versions/latest/data"
+        )
 
-                # Remove uuid from row
-                row.pop("uuid", None)
+    def build_cache(self, config, offline=False):
+        """
+        Ingests the public gateway dataset.
 
-                row["publisher_id"] = (
-                    None
-                    if row["publisher"] is None
-                    else re.sub(
-                        r"[^a-zA-Z0-9]",
-                        "",
-                        row["publisher"].replace(" ", "").lower(),
-                    )
-                )
+        The dataset is fetched into the on-disk snapshot with a conditional
+        request, and only ingested if it differs from the last dataset
+        ingested. An offline rebuild ingests the snapshot without fetching.
 
-                corrected_related_legislation = rectify_malformed_json_to_list(
-                    row.get("related_legislation_dict")
-                )
-                corrected_related_legislation_json = json.dumps(
-                    corrected_related_legislation
+        Args:
+            config (SearchDocumentConfig): Includes the request timeout.
+            offline (bool, optional): Ingest the snapshot without fetching.
+
+        Returns:
+            tuple[int, dict, list[dict]]: The status code (304 if the
+                dataset hasn't changed, 500 if it couldn't be ingested), the
+                number of documents inserted, updated, deleted and
+                unchanged, and the failed documents.
+        """
+        counts = {}
+        failures = []
+        snapshot = GatewaySnapshot(settings.GATEWAY_SNAPSHOT_DIR)
+
+        if offline:
+            logger.info("rebuilding from public gateway snapshot...")
+            if not snapshot.exists():
+                logger.error("error rebuilding offline: no snapshot")
+                return 500, counts, failures
+        else:
+            logger.info("fetching all data from public gateway...")
+
+            # URL encode the query for the API request
+            params = {"format": "json"}
+
+            # Start time
+            start_time = time.time()
+
+            # Conditional request, the payload is written to the snapshot
+            # if it has changed
+            status_code = snapshot.fetch(
+                config,
+                self._base_url,
+                params,
+                chunk_size=settings.INGEST_CHUNK_SIZE,
+            )
+
+            # End time
+            end_time = time.time()
+            initial_request_system_time = end_time - start_time
+
+            logger.debug(
+                f"fetching all data from public gateway took "
+                f"{initial_request_system_time} seconds"
+            )
+
+            if status_code is None:
+                logger.error("error fetching data from orpd: no data received")
+                return 500, counts, failures
+
+            # Skip the rebuild if this dataset has been ingested already
+            if not snapshot.needs_ingest():
+                logger.info("public gateway data unchanged, not rebuilding")
+                return 304, counts, failures
+
+        # Decode and prepare the documents one at a time as the snapshot
+        # is read
+        documents = (
+            _prepare_document(row)
+            for row in iter_json_array(
+                snapshot.iter_text(settings.INGEST_CHUNK_SIZE),
+                "uk_legislation_pdg",
+            )
+        )
+
+        # A payload without documents is a failed fetch, not a dataset with
+        # every stored document deleted
+        first_document = next(documents, None)
+        if first_document is None:
+            logger.error("error rebuilding cache: no documents received")
+            return 500, counts, failures
+        documents = itertools.chain([first_document], documents)
+
+        stored_hashes = get_content_hashes()
+
+        if not stored_hashes:
+            # Nothing to compare with, stream the documents into a
+            # staging table in validated batches while searches keep
+            # using the live table
+            create_staging_table()
+            inserted, failures = insert_documents(
+                documents, model=StagingDataResponseModel
+            )
+            counts = {
+                "inserted": inserted,
+                "updated": 0,
+                "deleted": 0,
+                "unchanged": 0,
+            }
+
+            # Keep the live table if the staging table is empty or too
+            # many documents failed
+            error = ingest_error(inserted, failures)
+            if error:
+                logger.error(f"error rebuilding cache, not swapping: {error}")
+                return 500, counts, failures
+
+            update_search_vectors(StagingDataResponseModel)
+
+            # Replace the live table with the staging table in one
+            # transaction
+            swap_staging_table()
+        else:
+            # Compare the documents with the stored documents by
+            # content hash, only the changed documents are kept
+            changes = diff_documents(documents, stored_hashes)
+            counts = changes.counts
+            logger.info(f"documents compared with stored documents: {counts}")
+
+            changed_count = len(changes.changed) + len(changes.deleted)
+            if not changed_count:
+                logger.info("no documents changed")
+                snapshot.mark_ingested()
+                return 200, counts, failures
+
+            changed_ids = [document["id"] for document in changes.changed]
+            if (
+                changed_count
+                > len(stored_hashes) * settings.INGEST_MAX_CHANGE_RATIO
+            ):
+                # Copy the unchanged documents into a staging table,
+                # add the changed documents and swap it in
+                create_staging_table()
+                copied = copy_live_documents(changed_ids + changes.deleted)
+                inserted, failures = insert_documents(
+                    changes.changed, model=StagingDataResponseModel
                 )
-                row["related_legislation"] = corrected_related_legislation_json
 
-                # Remove related_legislation_dict from row
-                row.pop("related_legislation_dict", None)
+                error = ingest_error(copied + inserted, failures)
+                if error:
+                    logger.error(
+                        f"error rebuilding cache, not swapping: {error}"
+                    )
+                    return 500, counts, failures
 
-                end_time = time.time()
-                process_related_legislation_time = end_time - start_time
-                logger.debug(
-                    f"row {row["id"]} took "
-                    f"{process_related_legislation_time} seconds to process"
+                update_search_vectors(
+                    StagingDataResponseModel, ids=changed_ids
                 )
-                was_inserted = insert_or_update_document(row)
-                if was_inserted:
-                    inserted_document_count += 1
-                else:
+                swap_staging_table()
+            else:
+                # Only write the changed documents to the live table
+                failures, error = apply_document_changes(changes)
+                if error:
                     logger.error(
-                        f"error inserting or updating document: {row}"
+                        f"error rebuilding cache, changes rolled back: "
+                        f"{error}"
                     )
-        else:
-            logger.error("error fetching data from orpd: no data received")
-            return 500, 0
+                    return 500, counts, failures
+
+        logger.info(f"ingested documents: {counts}, {len(failures)} failed")
+        refresh_catalogues()
+
+        # Invalidate cached search results for the previous dataset
+        bump_dataset_generation()
+        snapshot.mark_ingested()
 
-        # return process_code, inserted_document_count
-        return 200, inserted_document_count
+        # return process_code, document counts, failures
+        return 200, counts, failures
@@ -6,5 +6,12 @@ from app.cache.manage_cache import rebuild_cache
 class Command(BaseCommand):
     help = "Rebuilds the cache"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Rebuild from the public gateway snapshot without fetching",
+        )
+
     def handle(self, *args, **options):
-        rebuild_cache()
+        rebuild_cache(offline=options["offline"])
@@ -16,3 +16,7 @@ class SearchConfig(AppConfig):
     name = "app.search"
     verbose_name = "Find business regulations application functionality"
     default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        # Register custom lookups used by the search queries
+        from app.search import lookups  # noqa: F401
@@ -16,6 +16,7 @@ class SearchDocumentConfig:
         publisher_names=None,
         sort_by=None,
         id=None,
+        cursor=None,
     ):
         """
         Initializes the SearchRequest object with the given parameters.
@@ -38,6 +39,10 @@ class SearchDocumentConfig:
             id (Optional[str]):
                 An optional identifier for the search request. Defaults to
                 None.
+            cursor (Optional[str]):
+                An opaque pagination cursor from a previous page of results.
+                When given, it is used instead of the offset. Defaults to
+                None.
 
         Attributes:
             search_query (str): The search query string.
@@ -53,6 +58,8 @@ class SearchDocumentConfig:
                 The field by which to sort the search results.
             id (Optional[str]):
                 An optional identifier for the search request.
+            cursor (Optional[str]):
+                An opaque pagination cursor.
         """
         self.search_query = search_query
         self.document_types = (
@@ -70,6 +77,7 @@ class SearchDocumentConfig:
         )
         self.sort_by = sort_by
         self.id = id
+        self.cursor = cursor
 
         logger.debug(f"document_types from request: {self.document_types}")
         logger.debug(f"publisher_names from request: {self.publisher_names}")
@@ -122,6 +130,12 @@ class SearchDocumentConfig:
             self.id = sanitize_input(self.id)
             logger.debug(f"id after sanitization: {self.id}")
 
+        # Sanitize cursor
+        if self.cursor:
+            logger.debug(f"cursor before sanitization: {self.cursor}")
+            self.cursor = sanitize_input(self.cursor)
+            logger.debug(f"cursor after sanitization: {self.cursor}")
+
         self._has_been_sanitized = True
 
     def validate(self):
@@ -171,6 +185,7 @@ class SearchDocumentConfig:
         - publisher_names: The list of publisher names to filter the search.
         - sort_by: The criteria for sorting the search results.
         - id: The unique identifier for the search query.
+        - cursor: The pagination cursor.
 
         """
         # Print config as a json object
@@ -183,6 +198,7 @@ class SearchDocumentConfig:
             "publisher_names": self.publisher_names,
             "sort_by": self.sort_by,
             "id": self.id,
+            "cursor": self.cursor,
         }
         logger.info(
             f"service [{type}] - configuration from request: {json_output}"
@@ -0,0 +1,27 @@
+from django.db.models import Lookup, TextField
+
+
+@TextField.register_lookup
+class TrigramContains(Lookup):
+    """
+    Case-insensitive substring lookup rendered as 'ILIKE'.
+
+    Behaves like 'icontains' but, unlike 'icontains' (which renders as
+    'UPPER(column) LIKE UPPER(value)'), compares the column directly so that
+    pg_trgm GIN indexes ('gin_trgm_ops') on the column can be used.
+
+    Usage:
+        DataResponseModel.objects.filter(title__trigram_contains="safety")
+    """
+
+    lookup_name = "trigram_contains"
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        rhs_params = [
+            f"%{connection.ops.prep_for_like_query(param)}%"
+            for param in rhs_params
+        ]
+        return f"{lhs} ILIKE {rhs}", [*lhs_params, *rhs_params]
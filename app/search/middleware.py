@@ -0,0 +1,23 @@
+from app.search.utils.cache import warm_per_generation
+from app.search.utils.spelling import get_spelling_lexicon
+from app.search.utils.suggest import get_suggest_index
+
+# Per-generation structures built in each web worker as soon as a new
+# dataset generation is seen
+WARMED_BUILDERS = [get_suggest_index, get_spelling_lexicon]
+
+
+class WarmSearchIndexesMiddleware:
+    """
+    Rebuilds the in-process search structures of a web worker in the
+    background when the dataset generation changes, so a cache rebuild in
+    another process (the rebuildcache command or the celery task) is warmed
+    where the structures are served.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        warm_per_generation(WARMED_BUILDERS)
+        return self.get_response(request)
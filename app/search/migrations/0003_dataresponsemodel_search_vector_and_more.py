@@ -0,0 +1,41 @@
+# Generated by Django 4.2.18 on 2026-10-18 00:53
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+
+from django.db import migrations
+
+
+def populate_search_vector(apps, schema_editor):
+    DataResponseModel = apps.get_model("search", "DataResponseModel")
+    DataResponseModel.objects.update(
+        search_vector=django.contrib.postgres.search.SearchVector(
+            "title", "description", "regulatory_topics"
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0002_dataresponsemodel_source_date_issued_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dataresponsemodel",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="search_vector_gin_idx"
+            ),
+        ),
+        migrations.RunPython(
+            populate_search_vector, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.18 on 2026-10-18 01:12
+
+import django.contrib.postgres.search
+
+from django.db import migrations
+
+
+def populate_weighted_search_vectors(apps, schema_editor):
+    DataResponseModel = apps.get_model("search", "DataResponseModel")
+    title_vector = django.contrib.postgres.search.SearchVector(
+        "title", weight="A"
+    )
+    description_vector = django.contrib.postgres.search.SearchVector(
+        "description", weight="B"
+    )
+    regulatory_topics_vector = django.contrib.postgres.search.SearchVector(
+        "regulatory_topics", weight="C"
+    )
+    DataResponseModel.objects.update(
+        title_vector=title_vector,
+        description_vector=description_vector,
+        regulatory_topics_vector=regulatory_topics_vector,
+        search_vector=(
+            title_vector + description_vector + regulatory_topics_vector
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0003_dataresponsemodel_search_vector_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="description_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="regulatory_topics_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="title_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, null=True
+            ),
+        ),
+        migrations.RunPython(
+            populate_weighted_search_vectors, migrations.RunPython.noop
+        ),
+    ]
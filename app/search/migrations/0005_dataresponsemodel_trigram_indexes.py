@@ -0,0 +1,41 @@
+# Generated by Django 4.2.18 on 2026-10-18 01:31
+
+import django.contrib.postgres.indexes
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0004_dataresponsemodel_weighted_search_vectors"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="dataresponsemodel",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"],
+                name="title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dataresponsemodel",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["description"],
+                name="description_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dataresponsemodel",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["regulatory_topics"],
+                name="regulatory_topics_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.18 on 2026-10-18 03:05
+
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Lower, NullIf, Trim
+
+
+def populate_filter_columns(apps, schema_editor):
+    DataResponseModel = apps.get_model("search", "DataResponseModel")
+    DataResponseModel.objects.update(
+        type_key=NullIf(Lower(Trim(F("type"))), Value(""))
+    )
+    DataResponseModel.objects.update(
+        type_group=Case(
+            When(type_key__contains="standard", then=Value("standard")),
+            When(type_key__contains="guidance", then=Value("guidance")),
+            When(type_key__isnull=False, then=Value("legislation")),
+            default=None,
+            output_field=models.TextField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0005_dataresponsemodel_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="type_key",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="type_group",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="dataresponsemodel",
+            index=models.Index(fields=["type_key"], name="type_key_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="dataresponsemodel",
+            index=models.Index(fields=["type_group"], name="type_group_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="dataresponsemodel",
+            index=models.Index(
+                fields=["publisher_id"], name="publisher_id_idx"
+            ),
+        ),
+        migrations.RunPython(
+            populate_filter_columns, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.18 on 2026-10-18 03:40
+
+import re
+
+from django.db import migrations, models
+from django.db.models import F, Min
+from django.db.models.functions import Trim
+
+
+def format_document_type(doc_type):
+    if " " in doc_type:
+        return " ".join(word.capitalize() for word in doc_type.split())
+    return re.sub(r"(?<!^)(?=[A-Z])", " ", doc_type)
+
+
+def populate_catalogues(apps, schema_editor):
+    DataResponseModel = apps.get_model("search", "DataResponseModel")
+    DocumentType = apps.get_model("search", "DocumentType")
+    Publisher = apps.get_model("search", "Publisher")
+
+    DocumentType.objects.bulk_create(
+        DocumentType(
+            type_key=item["type_key"],
+            name=item["name"],
+            label=format_document_type(item["name"]),
+            group=item["type_group"],
+        )
+        for item in DataResponseModel.objects.filter(type_key__isnull=False)
+        .values("type_key", "type_group")
+        .annotate(name=Min(Trim(F("type"))))
+    )
+    Publisher.objects.bulk_create(
+        Publisher(publisher_id=item["publisher_id"], name=item["name"])
+        for item in DataResponseModel.objects.filter(
+            publisher_id__isnull=False, publisher__isnull=False
+        )
+        .exclude(publisher_id__exact="")
+        .values("publisher_id")
+        .annotate(name=Min(Trim(F("publisher"))))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0006_dataresponsemodel_filter_columns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentType",
+            fields=[
+                (
+                    "type_key",
+                    models.TextField(primary_key=True, serialize=False),
+                ),
+                ("name", models.TextField()),
+                ("label", models.TextField()),
+                ("group", models.TextField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Publisher",
+            fields=[
+                (
+                    "publisher_id",
+                    models.TextField(primary_key=True, serialize=False),
+                ),
+                ("name", models.TextField()),
+            ],
+        ),
+        migrations.RunPython(populate_catalogues, migrations.RunPython.noop),
+    ]
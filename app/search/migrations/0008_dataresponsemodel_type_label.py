@@ -0,0 +1,32 @@
+# Generated by Django 4.2.18 on 2026-10-18 04:02
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_type_label(apps, schema_editor):
+    DataResponseModel = apps.get_model("search", "DataResponseModel")
+    DocumentType = apps.get_model("search", "DocumentType")
+    DataResponseModel.objects.update(
+        type_label=Subquery(
+            DocumentType.objects.filter(type_key=OuterRef("type_key")).values(
+                "label"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0007_documenttype_publisher"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="type_label",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_type_label, migrations.RunPython.noop),
+    ]
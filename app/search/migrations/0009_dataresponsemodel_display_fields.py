@@ -0,0 +1,98 @@
+# Generated by Django 4.2.18 on 2026-10-18 04:31
+
+import json
+
+import django.contrib.postgres.fields
+
+from django.db import migrations, models
+
+from app.search.utils.date import format_partial_date_govuk
+
+
+def _related_legislation_list(related_legislation):
+    try:
+        related_legislation = json.loads(related_legislation)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(related_legislation, list) or not all(
+        isinstance(item, dict) and item.get("title") and item.get("url")
+        for item in related_legislation
+    ):
+        return None
+    return related_legislation or None
+
+
+def populate_display_fields(apps, schema_editor):
+    DataResponseModel = apps.get_model("search", "DataResponseModel")
+    documents = []
+    for document in DataResponseModel.objects.iterator(chunk_size=1000):
+        document.display_date_issued = format_partial_date_govuk(
+            document.source_date_issued
+        )
+        document.display_date_modified = format_partial_date_govuk(
+            document.source_date_modified
+        )
+        document.display_date_valid = format_partial_date_govuk(
+            document.source_date_valid
+        )
+        document.regulatory_topics_list = (
+            document.regulatory_topics.split("\n")
+            if document.regulatory_topics
+            else None
+        )
+        document.related_legislation_list = _related_legislation_list(
+            document.related_legislation
+        )
+        documents.append(document)
+
+    DataResponseModel.objects.bulk_update(
+        documents,
+        [
+            "display_date_issued",
+            "display_date_modified",
+            "display_date_valid",
+            "regulatory_topics_list",
+            "related_legislation_list",
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0008_dataresponsemodel_type_label"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="display_date_issued",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="display_date_modified",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="display_date_valid",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="regulatory_topics_list",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.TextField(), blank=True, null=True, size=None
+            ),
+        ),
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="related_legislation_list",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            populate_display_fields, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 4.2.18 on 2026-10-18 01:19
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.search
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0009_dataresponsemodel_display_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StagingDataResponseModel",
+            fields=[
+                ("title", models.TextField(blank=True, null=True)),
+                ("identifier", models.TextField(blank=True, null=True)),
+                ("publisher", models.TextField(blank=True, null=True)),
+                ("publisher_id", models.TextField(blank=True, null=True)),
+                ("language", models.TextField(blank=True, null=True)),
+                ("format", models.TextField(blank=True, null=True)),
+                ("description", models.TextField(blank=True, null=True)),
+                ("date_issued", models.DateField(blank=True, null=True)),
+                ("date_modified", models.DateField(blank=True, null=True)),
+                ("date_valid", models.TextField(blank=True, null=True)),
+                (
+                    "source_date_issued",
+                    models.TextField(blank=True, null=True),
+                ),
+                (
+                    "source_date_modified",
+                    models.TextField(blank=True, null=True),
+                ),
+                ("source_date_valid", models.TextField(blank=True, null=True)),
+                ("sort_date", models.DateField(blank=True, null=True)),
+                ("audience", models.TextField(blank=True, null=True)),
+                ("coverage", models.TextField(blank=True, null=True)),
+                ("subject", models.TextField(blank=True, null=True)),
+                ("type", models.TextField(blank=True, null=True)),
+                ("license", models.TextField(blank=True, null=True)),
+                ("regulatory_topics", models.TextField(blank=True, null=True)),
+                ("status", models.TextField(blank=True, null=True)),
+                (
+                    "date_uploaded_to_orp",
+                    models.DateField(blank=True, null=True),
+                ),
+                ("has_format", models.TextField(blank=True, null=True)),
+                ("is_format_of", models.TextField(blank=True, null=True)),
+                ("has_version", models.TextField(blank=True, null=True)),
+                ("is_version_of", models.TextField(blank=True, null=True)),
+                ("references", models.TextField(blank=True, null=True)),
+                ("is_referenced_by", models.TextField(blank=True, null=True)),
+                ("has_part", models.TextField(blank=True, null=True)),
+                ("is_part_of", models.TextField(blank=True, null=True)),
+                ("is_replaced_by", models.TextField(blank=True, null=True)),
+                ("replaces", models.TextField(blank=True, null=True)),
+                (
+                    "related_legislation",
+                    models.TextField(blank=True, null=True),
+                ),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        blank=True, null=True
+                    ),
+                ),
+                (
+                    "title_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        blank=True, null=True
+                    ),
+                ),
+                (
+                    "description_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        blank=True, null=True
+                    ),
+                ),
+                (
+                    "regulatory_topics_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        blank=True, null=True
+                    ),
+                ),
+                ("type_key", models.TextField(blank=True, null=True)),
+                ("type_group", models.TextField(blank=True, null=True)),
+                ("type_label", models.TextField(blank=True, null=True)),
+                (
+                    "display_date_issued",
+                    models.TextField(blank=True, null=True),
+                ),
+                (
+                    "display_date_modified",
+                    models.TextField(blank=True, null=True),
+                ),
+                (
+                    "display_date_valid",
+                    models.TextField(blank=True, null=True),
+                ),
+                (
+                    "regulatory_topics_list",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.TextField(),
+                        blank=True,
+                        null=True,
+                        size=None,
+                    ),
+                ),
+                (
+                    "related_legislation_list",
+                    models.JSONField(blank=True, null=True),
+                ),
+                ("id", models.TextField(primary_key=True, serialize=False)),
+            ],
+            options={
+                "db_table": "search_dataresponsemodel_staging",
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0010_stagingdataresponsemodel"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataresponsemodel",
+            name="content_hash",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
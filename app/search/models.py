@@ -1,13 +1,20 @@
 import logging
 
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 logger = logging.getLogger(__name__)
 
 
-class DataResponseModel(models.Model):
+class AbstractDataResponseModel(models.Model):
     """
-    DataResponseModel
+    AbstractDataResponseModel
+
+    The fields of a data response, shared by the live DataResponseModel
+    table and the StagingDataResponseModel table a cache rebuild loads
+    into.
 
     A Django model representing various metadata fields related to data
     responses.
@@ -48,6 +55,30 @@ class DataResponseModel(models.Model):
             Indicates if the data response is replaced by another resource.
         replaces: Indicates if the data response replaces another resource.
         related_legislation: Related legislation details for the data response.
+        search_vector:
+            Precomputed full text search vector over the title (weight A),
+            description (weight B) and regulatory topics (weight C),
+            populated at ingest time.
+        title_vector: Precomputed search vector of the title (weight A).
+        description_vector:
+            Precomputed search vector of the description (weight B).
+        regulatory_topics_vector:
+            Precomputed search vector of the regulatory topics (weight C).
+        type_key:
+            Trimmed, lower case document type used for exact type filters.
+        type_group:
+            Document type group (legislation, guidance or standard) used
+            for type group filters.
+        type_label: Display label of the document type.
+        display_date_issued: GOV.UK formatted source_date_issued.
+        display_date_modified: GOV.UK formatted source_date_modified.
+        display_date_valid: GOV.UK formatted source_date_valid.
+        regulatory_topics_list: Regulatory topics as a list.
+        related_legislation_list:
+            Validated related legislation, a list of title and url dicts.
+        content_hash:
+            Hash of the ingested fields, compared by the next ingest to
+            find changed documents.
         id: Primary key of the data response.
     """
 
@@ -84,4 +115,112 @@ class DataResponseModel(models.Model):
     is_replaced_by = models.TextField(null=True, blank=True)
     replaces = models.TextField(null=True, blank=True)
     related_legislation = models.TextField(null=True, blank=True)
+    search_vector = SearchVectorField(null=True, blank=True)
+    title_vector = SearchVectorField(null=True, blank=True)
+    description_vector = SearchVectorField(null=True, blank=True)
+    regulatory_topics_vector = SearchVectorField(null=True, blank=True)
+    type_key = models.TextField(null=True, blank=True)
+    type_group = models.TextField(null=True, blank=True)
+    type_label = models.TextField(null=True, blank=True)
+    display_date_issued = models.TextField(null=True, blank=True)
+    display_date_modified = models.TextField(null=True, blank=True)
+    display_date_valid = models.TextField(null=True, blank=True)
+    regulatory_topics_list = ArrayField(
+        models.TextField(), null=True, blank=True
+    )
+    related_legislation_list = models.JSONField(null=True, blank=True)
+    content_hash = models.TextField(null=True, blank=True)
     id = models.TextField(primary_key=True)
+
+    class Meta:
+        abstract = True
+
+
+class DataResponseModel(AbstractDataResponseModel):
+    """
+    DataResponseModel
+
+    The documents served by search, replaced as a whole by each cache
+    rebuild.
+    """
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="search_vector_gin_idx"),
+            # Trigram indexes (pg_trgm) for the partial match fallback
+            GinIndex(
+                fields=["title"],
+                name="title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["description"],
+                name="description_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["regulatory_topics"],
+                name="regulatory_topics_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            # Exact match filter indexes
+            models.Index(fields=["type_key"], name="type_key_idx"),
+            models.Index(fields=["type_group"], name="type_group_idx"),
+            models.Index(fields=["publisher_id"], name="publisher_id_idx"),
+        ]
+
+
+class StagingDataResponseModel(AbstractDataResponseModel):
+    """
+    StagingDataResponseModel
+
+    The table a cache rebuild loads the documents into before it is swapped
+    in as the DataResponseModel table.
+
+    Created for each rebuild as a copy of the DataResponseModel table (see
+    app.search.utils.staging) rather than by migrations.
+    """
+
+    class Meta:
+        managed = False
+        db_table = "search_dataresponsemodel_staging"
+
+
+class DocumentType(models.Model):
+    """
+    DocumentType
+
+    Catalogue of the distinct document types in DataResponseModel, rebuilt
+    by every cache rebuild so the document type filters and labels don't
+    need a DISTINCT query per request.
+
+    Attributes:
+        type_key: Trimmed, lower case document type (DataResponseModel
+            type_key).
+        name: Trimmed document type, as used by the type filters.
+        label: Display label of the document type.
+        group: Document type group (legislation, guidance or standard).
+    """
+
+    type_key = models.TextField(primary_key=True)
+    name = models.TextField()
+    label = models.TextField()
+    group = models.TextField()
+
+
+class Publisher(models.Model):
+    """
+    Publisher
+
+    Catalogue of the distinct publishers in DataResponseModel, rebuilt by
+    every cache rebuild so the publisher filters don't need a DISTINCT
+    query per request.
+
+    Attributes:
+        publisher_id: Normalised publisher ID (DataResponseModel
+            publisher_id).
+        name: Trimmed publisher name.
+    """
+
+    publisher_id = models.TextField(primary_key=True)
+    name = models.TextField()
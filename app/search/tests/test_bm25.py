@@ -0,0 +1,95 @@
+import datetime
+import unittest
+
+from app.search.config import SearchDocumentConfig
+from app.search.utils.bm25 import BM25Index
+from app.search.utils.search import compile_search_query
+
+DOCUMENTS = [
+    {
+        "id": "a",
+        "title": "Lifting equipment regulations",
+        "description": "Rules for cranes.",
+        "regulatory_topics": "Machinery",
+        "type": "Primary Legislation",
+        "publisher_id": "healthandsafetyexecutive",
+        "sort_date": datetime.date(2010, 1, 1),
+    },
+    {
+        "id": "b",
+        "title": "Noise at work",
+        "description": "Guidance on equipment used for lifting loads.",
+        "regulatory_topics": "Health and safety",
+        "type": "Statutory guidance",
+        "publisher_id": "healthandsafetyexecutive",
+        "sort_date": datetime.date(2020, 1, 1),
+    },
+    {
+        "id": "c",
+        "title": "Waste water",
+        "description": "Lifting equipment for pumps.",
+        "regulatory_topics": "Environment",
+        "type": "Standard",
+        "publisher_id": "environmentagency",
+        "sort_date": None,
+    },
+]
+
+
+class TestBM25Index(unittest.TestCase):
+
+    def setUp(self):
+        self.index = BM25Index(DOCUMENTS)
+
+    def _search(self, search_string, **kwargs):
+        config = SearchDocumentConfig(search_string, **kwargs)
+        matches = self.index.search(
+            config, compile_search_query(search_string)
+        )
+        return list(self.index.ids[matches])
+
+    def test_empty_query_returns_all_by_most_recent(self):
+        self.assertEqual(self._search(""), ["b", "a", "c"])
+
+    def test_empty_query_sorted_by_relevance_returns_most_recent(self):
+        self.assertEqual(
+            self._search("", sort_by="relevance"), ["b", "a", "c"]
+        )
+
+    def test_phrase_requires_consecutive_words(self):
+        self.assertEqual(
+            sorted(self._search('"lifting equipment"')), ["a", "c"]
+        )
+
+    def test_and_operator(self):
+        self.assertEqual(self._search("noise AND lifting"), ["b"])
+
+    def test_or_operator(self):
+        self.assertEqual(sorted(self._search("noise OR waste")), ["b", "c"])
+
+    def test_relevance_puts_title_matches_first(self):
+        results = self._search("lifting", sort_by="relevance")
+
+        self.assertEqual(results[0], "a")
+        self.assertEqual(sorted(results), ["a", "b", "c"])
+
+    def test_type_and_publisher_filters(self):
+        self.assertEqual(
+            self._search("lifting", document_types=["guidance"]), ["b"]
+        )
+        self.assertEqual(
+            self._search("lifting", publisher_names=["environmentagency"]),
+            ["c"],
+        )
+        self.assertEqual(
+            self._search("lifting", publisher_names=["Environment Agency"]),
+            ["c"],
+        )
+
+    def test_falls_back_to_substring_matches(self):
+        self.assertEqual(sorted(self._search("lift")), ["a", "b", "c"])
+        self.assertEqual(self._search("ATER"), ["c"])
+        self.assertEqual(self._search("xyz"), [])
+
+    def test_stop_words_only_matches_nothing(self):
+        self.assertEqual(self._search("the"), [])
@@ -0,0 +1,101 @@
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+from app.search.config import SearchDocumentConfig
+from app.search.utils.cache import (
+    _warm_state,
+    bump_dataset_generation,
+    get_dataset_generation,
+    search_cache_key,
+    warm_per_generation,
+)
+
+
+class TestSearchCacheKey(unittest.TestCase):
+
+    def test_filter_order_does_not_change_key(self):
+        config_a = SearchDocumentConfig(
+            "health",
+            document_types=["guidance", "standard"],
+            publisher_names=["hse", "defra"],
+        )
+        config_b = SearchDocumentConfig(
+            "health",
+            document_types=["standard", "guidance"],
+            publisher_names=["defra", "hse"],
+        )
+
+        self.assertEqual(
+            search_cache_key(config_a), search_cache_key(config_b)
+        )
+
+    def test_page_and_sort_change_key(self):
+        config = SearchDocumentConfig("health")
+        next_page = SearchDocumentConfig("health", offset=2)
+        relevance = SearchDocumentConfig("health", sort_by="relevance")
+
+        self.assertNotEqual(
+            search_cache_key(config), search_cache_key(next_page)
+        )
+        self.assertNotEqual(
+            search_cache_key(config), search_cache_key(relevance)
+        )
+
+    def test_count_key_ignores_page(self):
+        config = SearchDocumentConfig("health")
+        next_page = SearchDocumentConfig("health", offset=2, limit=20)
+
+        self.assertEqual(
+            search_cache_key(config, "search-count", False),
+            search_cache_key(next_page, "search-count", False),
+        )
+
+    def test_bumping_generation_changes_key(self):
+        config = SearchDocumentConfig("health")
+        generation = get_dataset_generation()
+        key = search_cache_key(config)
+
+        self.assertEqual(bump_dataset_generation(), generation + 1)
+        self.assertNotEqual(search_cache_key(config), key)
+
+
+@patch("app.search.utils.cache.threading.Thread")
+@patch("app.search.utils.cache.get_dataset_generation", return_value=1)
+class TestWarmPerGeneration(unittest.TestCase):
+
+    def setUp(self):
+        _warm_state.clear()
+
+    def _builder(self, name, **kwargs):
+        builder = MagicMock(**kwargs)
+        builder.__name__ = name
+        return builder
+
+    def test_builds_once_per_generation(
+        self, mock_get_dataset_generation, mock_thread
+    ):
+        builder = self._builder("get_index")
+
+        warm_per_generation([builder])
+        warm_per_generation([builder])
+        mock_thread.call_args.kwargs["target"]()
+
+        mock_thread.assert_called_once()
+        builder.assert_called_once()
+
+        mock_get_dataset_generation.return_value = 2
+        warm_per_generation([builder])
+
+        self.assertEqual(mock_thread.call_count, 2)
+
+    def test_builder_error_does_not_stop_warming(
+        self, mock_get_dataset_generation, mock_thread
+    ):
+        failing = self._builder("get_index", side_effect=Exception("no db"))
+        builder = self._builder("get_lexicon")
+
+        warm_per_generation([failing, builder])
+        mock_thread.call_args.kwargs["target"]()
+
+        builder.assert_called_once()
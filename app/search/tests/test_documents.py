@@ -0,0 +1,254 @@
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+from app.search.utils.documents import (
+    DocumentChanges,
+    apply_document_changes,
+    content_hash,
+    diff_documents,
+    get_display_fields,
+    get_document_type_group,
+    ingest_error,
+    insert_documents,
+    label_document_type,
+    normalise_document_type,
+    update_search_vectors,
+)
+
+
+class TestDocumentTypeFilters(unittest.TestCase):
+
+    def test_normalise_document_type(self):
+        self.assertEqual(
+            normalise_document_type("Primary Legislation "),
+            "primary legislation",
+        )
+        self.assertIsNone(normalise_document_type("  "))
+        self.assertIsNone(normalise_document_type(None))
+
+    def test_document_type_group(self):
+        self.assertEqual(get_document_type_group("Standard "), "standard")
+        self.assertEqual(
+            get_document_type_group("Non-statutory guidance"), "guidance"
+        )
+        self.assertEqual(
+            get_document_type_group("EuropeanUnionDecision"), "legislation"
+        )
+        self.assertIsNone(get_document_type_group(None))
+
+    def test_label_document_type(self):
+        self.assertEqual(
+            label_document_type("EuropeanUnionDecision "),
+            "European Union Decision",
+        )
+        self.assertEqual(
+            label_document_type("Statutory guidance"), "Statutory Guidance"
+        )
+        self.assertIsNone(label_document_type(""))
+
+
+class TestGetDisplayFields(unittest.TestCase):
+
+    def test_display_fields(self):
+        related_legislation = [{"title": "Act", "url": "https://act"}]
+        fields = get_display_fields(
+            {
+                "source_date_issued": "2021-07-12",
+                "source_date_modified": "2021-09",
+                "source_date_valid": None,
+                "regulatory_topics": "building\nvehicle",
+            },
+            related_legislation,
+        )
+
+        self.assertEqual(
+            fields,
+            {
+                "display_date_issued": "12 July 2021",
+                "display_date_modified": "September 2021",
+                "display_date_valid": "",
+                "regulatory_topics_list": ["building", "vehicle"],
+                "related_legislation_list": related_legislation,
+            },
+        )
+
+    def test_invalid_or_empty_related_legislation(self):
+        self.assertIsNone(
+            get_display_fields({}, [{"title": "Act"}])[
+                "related_legislation_list"
+            ]
+        )
+        self.assertIsNone(
+            get_display_fields({}, [])["related_legislation_list"]
+        )
+
+
+def _insert_all(model, documents, update):
+    return len(documents), []
+
+
+class TestInsertDocuments(unittest.TestCase):
+
+    @patch(
+        "app.search.utils.documents._create_documents",
+        side_effect=_insert_all,
+    )
+    def test_documents_are_inserted_in_batches(self, mock_create):
+        documents = [{"id": f"doc{i}", "title": "A"} for i in range(5)]
+
+        inserted, failures = insert_documents(documents, batch_size=2)
+
+        self.assertEqual(inserted, 5)
+        self.assertEqual(failures, [])
+        self.assertEqual(
+            [len(call.args[1]) for call in mock_create.call_args_list],
+            [2, 2, 1],
+        )
+
+    @patch(
+        "app.search.utils.documents._create_documents",
+        side_effect=_insert_all,
+    )
+    def test_first_document_with_an_id_is_kept(self, mock_create):
+        inserted, failures = insert_documents(
+            [{"id": "doc1", "title": "A"}, {"id": "doc1", "title": "B"}]
+        )
+
+        self.assertEqual(inserted, 1)
+        self.assertEqual(
+            failures, [{"id": "doc1", "error": "document already exists"}]
+        )
+        self.assertEqual(mock_create.call_args.args[1][0].title, "A")
+
+    @patch(
+        "app.search.utils.documents._create_documents",
+        side_effect=_insert_all,
+    )
+    def test_invalid_documents_are_reported(self, mock_create):
+        inserted, failures = insert_documents(
+            [{"id": "doc1"}, {"id": "doc2", "unknown_field": "x"}]
+        )
+
+        self.assertEqual(inserted, 1)
+        self.assertEqual([failure["id"] for failure in failures], ["doc2"])
+
+
+class TestDiffDocuments(unittest.TestCase):
+
+    def test_content_hash_ignores_key_order(self):
+        self.assertEqual(
+            content_hash({"id": "doc1", "title": "A"}),
+            content_hash({"title": "A", "id": "doc1"}),
+        )
+        self.assertNotEqual(
+            content_hash({"id": "doc1", "title": "A"}),
+            content_hash({"id": "doc1", "title": "B"}),
+        )
+
+    def test_changes(self):
+        documents = [
+            {"id": "new", "content_hash": "a"},
+            {"id": "changed", "content_hash": "b"},
+            {"id": "same", "content_hash": "c"},
+        ]
+        stored_hashes = {"changed": "x", "same": "c", "gone": "d"}
+
+        changes = diff_documents(documents, stored_hashes)
+
+        self.assertEqual(
+            [document["id"] for document in changes.changed],
+            ["new", "changed"],
+        )
+        self.assertEqual(changes.deleted, ["gone"])
+        self.assertEqual(
+            changes.counts,
+            {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1},
+        )
+
+    def test_no_changes(self):
+        changes = diff_documents(
+            [{"id": "same", "content_hash": "c"}], {"same": "c"}
+        )
+
+        self.assertEqual(changes.changed, [])
+        self.assertEqual(changes.deleted, [])
+
+
+class TestIngestError(unittest.TestCase):
+
+    def test_ingest_error(self):
+        self.assertIsNone(ingest_error(10, [{"id": "a"}]))
+        self.assertEqual(ingest_error(0, []), "no documents were loaded")
+        self.assertEqual(
+            ingest_error(8, [{"id": "a"}, {"id": "b"}]),
+            "2 of 10 documents failed to load",
+        )
+
+
+@patch("app.search.utils.documents.update_search_vectors")
+@patch("app.search.utils.documents.DataResponseModel")
+@patch("app.search.utils.documents.transaction")
+class TestApplyDocumentChanges(unittest.TestCase):
+
+    def _changes(self, changed, unchanged):
+        return DocumentChanges(
+            changed=[{"id": f"doc{i}"} for i in range(changed)],
+            deleted=["old"],
+            counts={"unchanged": unchanged},
+        )
+
+    @patch(
+        "app.search.utils.documents.insert_documents",
+        return_value=(2, []),
+    )
+    def test_changes_are_applied(
+        self,
+        mock_insert_documents,
+        mock_transaction,
+        mock_model,
+        mock_update_search_vectors,
+    ):
+        failures, error = apply_document_changes(self._changes(2, 8))
+
+        self.assertEqual((failures, error), ([], None))
+        mock_transaction.set_rollback.assert_not_called()
+        mock_model.objects.filter.assert_called_once_with(pk__in=["old"])
+        mock_update_search_vectors.assert_called_once_with(
+            ids=["doc0", "doc1"], raise_errors=True
+        )
+
+    @patch(
+        "app.search.utils.documents.insert_documents",
+        return_value=(1, [{"id": "doc1"}, {"id": "doc2"}]),
+    )
+    def test_too_many_failures_are_rolled_back(
+        self,
+        mock_insert_documents,
+        mock_transaction,
+        mock_model,
+        mock_update_search_vectors,
+    ):
+        failures, error = apply_document_changes(self._changes(3, 2))
+
+        self.assertEqual(len(failures), 2)
+        self.assertEqual(error, "2 of 5 documents failed to load")
+        mock_transaction.set_rollback.assert_called_once_with(True)
+        mock_model.objects.filter.assert_not_called()
+        mock_update_search_vectors.assert_not_called()
+
+
+class TestUpdateSearchVectors(unittest.TestCase):
+
+    def setUp(self):
+        self.model = MagicMock()
+        self.model.objects.all.return_value.update.side_effect = Exception(
+            "current transaction is aborted"
+        )
+
+    def test_errors_are_logged(self):
+        self.assertEqual(update_search_vectors(self.model), 0)
+
+    def test_errors_are_raised_when_asked(self):
+        with self.assertRaises(Exception):
+            update_search_vectors(self.model, raise_errors=True)
@@ -0,0 +1,106 @@
+import gzip
+import json
+import unittest
+
+from unittest.mock import patch
+
+from rest_framework.test import APIRequestFactory
+
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from app.search.utils import export
+from app.search.views import download_csv
+from fbr.urls import DataResponseViewSet
+
+
+class FakeResults:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def values(self, *fields):
+        return iter(self.rows)
+
+
+class TestExport(unittest.TestCase):
+
+    def test_stream_csv(self):
+        lines = list(
+            export.stream_csv(("title", "type"), [("A, B", "Standard")])
+        )
+
+        self.assertEqual(lines, ["title,type\r\n", '"A, B",Standard\r\n'])
+
+    def test_stream_csv_without_rows_is_header_only(self):
+        self.assertEqual(
+            list(export.stream_csv(("title",), [])), ["title\r\n"]
+        )
+
+    def test_iter_results_from_in_memory_results(self):
+        results = FakeResults([{"id": "a", "title": "A"}])
+
+        self.assertEqual(
+            list(export.iter_results(results, ("title", "id"))), [("A", "a")]
+        )
+
+    def test_stream_ndjson(self):
+        lines = list(
+            export.stream_ndjson(
+                ("id", "topics"), [("a", ["waste", "energy"])]
+            )
+        )
+
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith("\n"))
+        self.assertEqual(
+            json.loads(lines[0]), {"id": "a", "topics": ["waste", "energy"]}
+        )
+
+    def test_gzip_stream_decompresses_to_input(self):
+        chunks = ["title,type\r\n", "A,Standard\r\n"] * 100
+
+        compressed = b"".join(export.gzip_stream(chunks))
+
+        self.assertEqual(gzip.decompress(compressed).decode(), "".join(chunks))
+
+    def test_gzip_stream_without_chunks_is_empty_archive(self):
+        self.assertEqual(
+            gzip.decompress(b"".join(export.gzip_stream([]))), b""
+        )
+
+
+class TestExportView(unittest.TestCase):
+
+    @override_settings(SEARCH_RELEVANCE_CANDIDATES=2)
+    @patch("app.search.utils.export.export_response")
+    def test_relevance_export_is_not_capped(self, mock_export_response):
+        mock_export_response.return_value = HttpResponse()
+        request = APIRequestFactory().get(
+            "/api/v1/export/", {"query": "waste", "sort": "relevance"}
+        )
+
+        response = DataResponseViewSet.as_view({"get": "export"})(request)
+
+        self.assertEqual(response.status_code, 200)
+        results, _ = mock_export_response.call_args.args
+        # Ranked, but every match beyond the 2 candidates is exported
+        self.assertIn("final_score", results.query.annotations)
+        self.assertNotIn("LIMIT", str(results.query))
+
+
+class TestDownloadCsv(unittest.TestCase):
+
+    @override_settings(SEARCH_RELEVANCE_CANDIDATES=2)
+    @patch("app.search.views._csv_rows", return_value=[])
+    def test_relevance_download_is_not_capped(self, mock_csv_rows):
+        request = RequestFactory().get(
+            "/download_csv/", {"query": "waste", "sort": "relevance"}
+        )
+
+        response = download_csv(request)
+
+        self.assertEqual(response.status_code, 200)
+        results, _ = mock_csv_rows.call_args.args
+        # Ranked, but every match beyond the 2 candidates is downloaded
+        self.assertIn("final_score", results.query.annotations)
+        self.assertNotIn("LIMIT", str(results.query))
@@ -0,0 +1,110 @@
+import unittest
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+
+from app.search.config import SearchDocumentConfig
+from app.search.utils.facets import get_facets
+
+FACET_ROWS = [
+    {
+        "type_key": "primary legislation",
+        "type_group": "legislation",
+        "type_name": "Primary Legislation",
+        "publisher_id": "healthandsafetyexecutive",
+        "publisher_name": "Health and Safety Executive",
+        "match_tier": 0,
+        "count": 3,
+    },
+    {
+        "type_key": "statutory guidance",
+        "type_group": "guidance",
+        "type_name": "Statutory guidance",
+        "publisher_id": "healthandsafetyexecutive",
+        "publisher_name": "Health and Safety Executive",
+        "match_tier": 0,
+        "count": 2,
+    },
+    {
+        "type_key": "standard",
+        "type_group": "standard",
+        "type_name": "Standard",
+        "publisher_id": "environmentagency",
+        "publisher_name": "Environment Agency",
+        "match_tier": 0,
+        "count": 5,
+    },
+]
+
+
+class TestGetFacets(unittest.TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @patch("app.search.utils.facets._facet_rows", return_value=FACET_ROWS)
+    def test_counts_are_disjunctive(self, mock_facet_rows):
+        config = SearchDocumentConfig(
+            "health",
+            document_types=["guidance"],
+            publisher_names=["healthandsafetyexecutive"],
+        )
+
+        facets = get_facets(config)
+
+        self.assertEqual(facets["results_total_count"], 2)
+        # Type counts ignore the type filter but apply the publisher filter
+        self.assertEqual(
+            facets["document_type_groups"],
+            [
+                {"name": "legislation", "count": 3},
+                {"name": "guidance", "count": 2},
+                {"name": "standard", "count": 0},
+            ],
+        )
+        # Publisher counts ignore the publisher filter but apply the type
+        # filter
+        self.assertEqual(
+            [
+                (facet["name"], facet["count"])
+                for facet in facets["publishers"]
+            ],
+            [("healthandsafetyexecutive", 2)],
+        )
+
+    @patch("app.search.utils.facets._facet_rows")
+    def test_counts_use_best_match_tier_of_each_value(self, mock_facet_rows):
+        # The Environment Agency standards only partially match
+        mock_facet_rows.return_value = [
+            FACET_ROWS[0],
+            {**FACET_ROWS[2], "match_tier": 1},
+        ]
+
+        facets = get_facets(SearchDocumentConfig("health"))
+
+        # Partial matches are dropped while there are strict matches
+        self.assertEqual(facets["results_total_count"], 3)
+        # Filtering on the publisher alone would return its partial matches
+        self.assertEqual(
+            [
+                (facet["name"], facet["count"])
+                for facet in facets["publishers"]
+            ],
+            [("environmentagency", 5), ("healthandsafetyexecutive", 3)],
+        )
+        self.assertEqual(
+            facets["document_type_groups"],
+            [
+                {"name": "legislation", "count": 3},
+                {"name": "guidance", "count": 0},
+                {"name": "standard", "count": 5},
+            ],
+        )
+
+    @patch("app.search.utils.facets._facet_rows", return_value=FACET_ROWS)
+    def test_facets_are_cached(self, mock_facet_rows):
+        config = SearchDocumentConfig("health")
+
+        self.assertEqual(get_facets(config), get_facets(config))
+        mock_facet_rows.assert_called_once()
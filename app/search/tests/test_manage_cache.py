@@ -0,0 +1,58 @@
+import unittest
+
+from unittest.mock import patch
+
+from app.cache.manage_cache import rebuild_cache
+from celery_worker.tasks import rebuild_cache as rebuild_cache_task
+
+MODULE = "app.cache.manage_cache"
+
+
+@patch(f"{MODULE}.PublicGateway")
+class TestRebuildCache(unittest.TestCase):
+
+    def test_reports_rebuilt_documents(self, mock_public_gateway):
+        mock_public_gateway.return_value.build_cache.return_value = (
+            200,
+            {"inserted": 1},
+            [],
+        )
+
+        result = rebuild_cache()
+
+        self.assertEqual(result["message"], "rebuilt cache")
+        self.assertEqual(list(result["details"]), ["public_gateway"])
+        self.assertEqual(result["documents"], {"inserted": 1, "failed": 0})
+
+
+@patch("builtins.print")
+@patch("celery_worker.tasks.PublicGateway")
+class TestRebuildCacheTask(unittest.TestCase):
+
+    def _rebuild(self, mock_public_gateway, mock_print, result):
+        mock_public_gateway.return_value.build_cache.return_value = result
+
+        rebuild_cache_task()
+
+        return mock_print.call_args.args[0]
+
+    def test_reports_rebuilt_documents(self, mock_public_gateway, mock_print):
+        report = self._rebuild(
+            mock_public_gateway, mock_print, (200, {"inserted": 2}, [{}])
+        )
+
+        self.assertEqual(report["message"], "rebuilt cache")
+        self.assertEqual(report["documents"], {"inserted": 2, "failed": 1})
+
+    def test_reports_unchanged_dataset(self, mock_public_gateway, mock_print):
+        report = self._rebuild(mock_public_gateway, mock_print, (304, {}, []))
+
+        self.assertEqual(
+            report["message"],
+            "public gateway data unchanged, cache not rebuilt",
+        )
+
+    def test_reports_failed_rebuild(self, mock_public_gateway, mock_print):
+        report = self._rebuild(mock_public_gateway, mock_print, (500, {}, []))
+
+        self.assertEqual(report["message"], "cache rebuild failed")
@@ -0,0 +1,109 @@
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+from django.contrib.postgres.search import SearchQuery
+from django.test import override_settings
+
+from app.search.config import SearchDocumentConfig
+from app.search.models import DataResponseModel
+from app.search.utils.calculate_score import calculate_score
+from app.search.utils.paginate import (
+    CURSOR_NEXT,
+    CURSOR_PREV,
+    _match_count,
+    _may_be_capped,
+    decode_cursor,
+    encode_cursor,
+)
+from app.search.utils.results import SearchResult
+
+
+class TestPaginationCursor(unittest.TestCase):
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(CURSOR_NEXT, [1, 0.0607927, "doc-1"], 20)
+
+        self.assertEqual(
+            decode_cursor(cursor),
+            {"d": CURSOR_NEXT, "k": [1, 0.0607927, "doc-1"], "i": 20},
+        )
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(CURSOR_PREV, ["2024-01-31", "a/b+c?"], 10)
+
+        self.assertRegex(cursor, r"^[A-Za-z0-9_-]+$")
+
+    def test_invalid_cursor(self):
+        self.assertIsNone(decode_cursor("garbage"))
+        self.assertIsNone(decode_cursor(encode_cursor("sideways", [], 0)))
+        self.assertIsNone(decode_cursor(encode_cursor(CURSOR_NEXT, [], -10)))
+
+
+class TestSearchResult(unittest.TestCase):
+
+    def test_to_json(self):
+        result = SearchResult(
+            {
+                "id": "doc-1",
+                "title": "Lifting equipment regulations",
+                "publisher": "Health and Safety Executive",
+                "description": "Rules for cranes.",
+                "type": "Primary Legislation ",
+                "type_label": "Primary Legislation",
+                "display_date_modified": "September 2021",
+                "display_date_issued": "12 July 2021",
+                "regulatory_topics_list": ["machinery"],
+                "sort_date": None,
+            }
+        )
+
+        self.assertEqual(
+            result.to_json(),
+            {
+                "id": "doc-1",
+                "title": "Lifting equipment regulations",
+                "publisher": "Health and Safety Executive",
+                "description": "Rules for cranes.",
+                "type": "Primary Legislation",
+                "source_date_modified": "September 2021",
+                "source_date_issued": "12 July 2021",
+                "regulatory_topics": ["machinery"],
+            },
+        )
+        self.assertFalse(hasattr(result, "__dict__"))
+
+
+class TestIsCapped(unittest.TestCase):
+
+    def setUp(self):
+        self.results = calculate_score(
+            SearchQuery("waste"), DataResponseModel.objects.all()
+        )
+
+    @override_settings(SEARCH_RELEVANCE_CANDIDATES=2)
+    def test_fewer_matches_than_cap_are_not_capped(self):
+        self.assertFalse(_may_be_capped(self.results, MagicMock(count=1)))
+
+    @override_settings(SEARCH_RELEVANCE_CANDIDATES=2)
+    def test_cap_matches_may_be_capped(self):
+        self.assertTrue(_may_be_capped(self.results, MagicMock(count=2)))
+
+    @override_settings(SEARCH_RELEVANCE_CANDIDATES=2)
+    def test_unranked_results_are_not_capped(self):
+        results = DataResponseModel.objects.all()
+
+        self.assertFalse(_may_be_capped(results, MagicMock(count=2)))
+
+    @patch("app.search.utils.paginate.SearchPaginator")
+    def test_matches_are_counted_as_most_recent_search(self, mock_paginator):
+        mock_paginator.return_value = MagicMock(count=1500, is_estimate=False)
+        config = SearchDocumentConfig("waste", sort_by="relevance")
+        matches = DataResponseModel.objects.all()
+
+        self.assertEqual(_match_count(config, matches), (1500, False))
+
+        # The count is cached with the unranked search, config is unchanged
+        _, limit, count_config = mock_paginator.call_args.args
+        self.assertIsNone(count_config.sort_by)
+        self.assertEqual(config.sort_by, "relevance")
@@ -0,0 +1,112 @@
+import unittest
+
+from unittest.mock import patch
+
+from app.cache.public_gateway import PublicGateway
+from app.search.config import SearchDocumentConfig
+from app.search.utils.documents import DocumentChanges
+
+MODULE = "app.cache.public_gateway"
+
+
+class TestBuildCache(unittest.TestCase):
+
+    def setUp(self):
+        self.mocks = {}
+        for name in [
+            "GatewaySnapshot",
+            "diff_documents",
+            "apply_document_changes",
+            "create_staging_table",
+            "insert_documents",
+            "update_search_vectors",
+            "swap_staging_table",
+            "refresh_catalogues",
+            "bump_dataset_generation",
+        ]:
+            patcher = patch(f"{MODULE}.{name}")
+            self.mocks[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = patch(f"{MODULE}._prepare_document", side_effect=dict)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(f"{MODULE}.get_content_hashes", return_value={})
+        self.mock_get_content_hashes = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.snapshot = self.mocks["GatewaySnapshot"].return_value
+
+    def _build_cache(self, rows):
+        with patch(f"{MODULE}.iter_json_array", return_value=iter(rows)):
+            return PublicGateway().build_cache(
+                SearchDocumentConfig(""), offline=True
+            )
+
+    def test_loaded_staging_table_is_swapped_in(self):
+        self.mocks["insert_documents"].return_value = (2, [])
+
+        status_code, counts, _ = self._build_cache([{"id": "a"}, {"id": "b"}])
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(counts["inserted"], 2)
+        self.mocks["swap_staging_table"].assert_called_once()
+        self.snapshot.mark_ingested.assert_called_once()
+
+    def test_empty_payload_keeps_live_table(self):
+        self.mocks["insert_documents"].return_value = (0, [])
+
+        status_code, _, _ = self._build_cache([])
+
+        self.assertEqual(status_code, 500)
+        self.mocks["swap_staging_table"].assert_not_called()
+        self.mocks["refresh_catalogues"].assert_not_called()
+        self.mocks["bump_dataset_generation"].assert_not_called()
+        self.snapshot.mark_ingested.assert_not_called()
+
+    def test_mostly_failed_load_keeps_live_table(self):
+        self.mocks["insert_documents"].return_value = (
+            1,
+            [{"id": "b"}, {"id": "c"}],
+        )
+
+        status_code, _, failures = self._build_cache(
+            [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+        )
+
+        self.assertEqual(status_code, 500)
+        self.assertEqual(len(failures), 2)
+        self.mocks["swap_staging_table"].assert_not_called()
+        self.snapshot.mark_ingested.assert_not_called()
+
+    def test_empty_payload_does_not_delete_stored_documents(self):
+        self.mock_get_content_hashes.return_value = {"a": "hash"}
+
+        status_code, _, _ = self._build_cache([])
+
+        self.assertEqual(status_code, 500)
+        self.mocks["diff_documents"].assert_not_called()
+        self.mocks["apply_document_changes"].assert_not_called()
+        self.mocks["swap_staging_table"].assert_not_called()
+        self.snapshot.mark_ingested.assert_not_called()
+
+    def test_rolled_back_changes_keep_stored_documents(self):
+        self.mock_get_content_hashes.return_value = {
+            f"doc{i}": "hash" for i in range(10)
+        }
+        self.mocks["diff_documents"].return_value = DocumentChanges(
+            changed=[{"id": "doc0"}],
+            deleted=[],
+            counts={"inserted": 0, "updated": 1, "deleted": 0},
+        )
+        self.mocks["apply_document_changes"].return_value = (
+            [{"id": "doc0"}],
+            "1 of 1 documents failed to load",
+        )
+
+        status_code, _, failures = self._build_cache([{"id": "doc0"}])
+
+        self.assertEqual(status_code, 500)
+        self.assertEqual(failures, [{"id": "doc0"}])
+        self.mocks["bump_dataset_generation"].assert_not_called()
+        self.snapshot.mark_ingested.assert_not_called()
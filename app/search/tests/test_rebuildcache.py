@@ -0,0 +1,22 @@
+import unittest
+
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+COMMAND = "app.core.management.commands.rebuildcache"
+
+
+class TestRebuildCacheCommand(unittest.TestCase):
+
+    @patch(f"{COMMAND}.rebuild_cache")
+    def test_fetches_by_default(self, mock_rebuild_cache):
+        call_command("rebuildcache")
+
+        mock_rebuild_cache.assert_called_once_with(offline=False)
+
+    @patch(f"{COMMAND}.rebuild_cache")
+    def test_offline_rebuilds_from_snapshot(self, mock_rebuild_cache):
+        call_command("rebuildcache", "--offline")
+
+        mock_rebuild_cache.assert_called_once_with(offline=True)
@@ -0,0 +1,51 @@
+import json
+import unittest
+
+from app.search.utils.retrieve_data import iter_json_array
+
+ROWS = [
+    {"uuid": "doc1", "title": 'Café "Hygiene" Regulations', "n": 1},
+    {"uuid": "doc2", "title": "Rail {Safety} [2024]", "n": 22},
+    {"uuid": "doc3", "title": None, "n": 333},
+]
+
+
+def _chunks(text, size):
+    starts = range(0, len(text), size)
+    return [text[start : start + size] for start in starts]  # noqa: E203
+
+
+class TestIterJsonArray(unittest.TestCase):
+
+    def test_items_are_decoded_from_any_chunk_size(self):
+        text = json.dumps({"other": [1, 2], "uk_legislation_pdg": ROWS})
+
+        for size in (1, 2, 7, 64, len(text)):
+            with self.subTest(size=size):
+                self.assertEqual(
+                    list(
+                        iter_json_array(
+                            _chunks(text, size), "uk_legislation_pdg"
+                        )
+                    ),
+                    ROWS,
+                )
+
+    def test_numbers_split_across_chunks(self):
+        chunks = ['{"values": [12', "34, 5", "6]}"]
+
+        self.assertEqual(list(iter_json_array(chunks, "values")), [1234, 56])
+
+    def test_empty_array(self):
+        chunks = ['{"values": [ ', " ]}"]
+
+        self.assertEqual(list(iter_json_array(chunks, "values")), [])
+
+    def test_missing_key(self):
+        self.assertEqual(list(iter_json_array(['{"other": []}'], "x")), [])
+
+    def test_truncated_array(self):
+        chunks = ['{"values": [{"a": 1}, {"b":']
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array(chunks, "values"))
@@ -7,8 +7,15 @@ from unittest.mock import MagicMock, call, patch
 
 import django
 
+from django.test import override_settings
+
 from app.search.config import SearchDocumentConfig
-from app.search.utils.search import create_search_query
+from app.search.utils.search import (
+    compile_search_query,
+    create_search_query,
+    search,
+    search_database,
+)
 from app.search.utils.terms import sanitize_input
 
 
@@ -384,3 +391,163 @@ class TestCreateSearchQuery(unittest.TestCase):
         # Assert the OR and AND operation was applied
         mock_query1.__or__.assert_called_with(mock_query2)
         # mock_query2.__and__.assert_called_with(mock_query3) # TODO:fix assert
+
+
+class TestCompileSearchQuery(unittest.TestCase):
+
+    def setUp(self):
+        compile_search_query.cache_clear()
+
+    @patch("app.search.utils.search.SearchQuery", autospec=True)
+    def test_counts_only_the_users_tokens(self, mock_search_query):
+        search_string = 'test AND "trial error" OR case'
+
+        compiled = compile_search_query(search_string)
+
+        self.assertEqual(
+            (compiled.num_ands, compiled.num_ors, compiled.num_phrases),
+            (1, 1, 1),
+        )
+        self.assertEqual(
+            compiled.tokens,
+            (
+                "test",
+                "AND",
+                '"trial error"',
+                "OR",
+                "case",
+                '"test"',
+                "AND",
+                '"trial error"',
+                "OR",
+                '"case"',
+            ),
+        )
+
+    @patch("app.search.utils.search.SearchQuery", autospec=True)
+    def test_repeated_query_is_served_from_cache(self, mock_search_query):
+        first = compile_search_query("health safety")
+        second = compile_search_query("health safety")
+
+        self.assertIs(first, second)
+        # 2 plain tokens and 1 phrase, built once only
+        self.assertEqual(mock_search_query.call_count, 3)
+        cache_info = compile_search_query.cache_info()
+        self.assertEqual(cache_info.hits, 1)
+        self.assertEqual(cache_info.misses, 1)
+
+    @patch("app.search.utils.search.SearchQuery", autospec=True)
+    def test_one_word_query_has_no_operators_or_phrases(
+        self, mock_search_query
+    ):
+        compiled = compile_search_query("waste")
+
+        self.assertEqual(compiled.tokens, ("waste", '"waste"'))
+        self.assertEqual(
+            (compiled.num_ands, compiled.num_ors, compiled.num_phrases),
+            (0, 0, 0),
+        )
+
+    def test_empty_query(self):
+        compiled = compile_search_query("")
+
+        self.assertIsNone(compiled.query)
+        self.assertEqual(compiled.tokens, ())
+        self.assertEqual(
+            (compiled.num_ands, compiled.num_ors, compiled.num_phrases),
+            (0, 0, 0),
+        )
+
+
+class TestSearchDatabase(unittest.TestCase):
+
+    def setUp(self):
+        compile_search_query.cache_clear()
+        patcher = patch(
+            "app.search.utils.search.suggest_query", return_value=None
+        )
+        self.mock_suggest_query = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_word_query_falls_back_to_partial_matches(self):
+        sql = str(search_database(SearchDocumentConfig("waste")).query)
+
+        # Strict and substring matches in a single tiered query
+        self.assertIn("plainto_tsquery", sql)
+        self.assertIn("ILIKE", sql)
+        self.assertIn("MIN(", sql)
+
+    def test_phrase_query_has_no_partial_matches(self):
+        sql = str(search_database(SearchDocumentConfig('"waste"')).query)
+
+        self.assertNotIn("ILIKE", sql)
+
+    def test_substring_only_match_is_kept_as_a_partial_match(self):
+        # "healt" has no full-text match for documents about health
+        queryset = search_database(SearchDocumentConfig("healt"))
+        sql, params = queryset.query.sql_with_params()
+
+        # Kept by a substring match on each field, in the partial tier
+        self.assertEqual(params.count("%healt%"), 3)
+        self.assertIn('U0."title" ILIKE %s', sql)
+        self.assertIn("THEN %s ELSE %s END) OVER ()", sql)
+
+    def test_misspelled_query_skips_partial_matches(self):
+        self.mock_suggest_query.return_value = "health"
+
+        sql = str(search_database(SearchDocumentConfig("helth")).query)
+
+        # The correction is suggested instead of substring matches
+        self.mock_suggest_query.assert_called_once_with("helth")
+        self.assertIn("plainto_tsquery", sql)
+        self.assertNotIn("ILIKE", sql)
+
+    @override_settings(SEARCH_RELEVANCE_CANDIDATES=2)
+    def test_relevance_search_ranks_top_candidates(self):
+        config = SearchDocumentConfig("waste", sort_by="relevance")
+
+        sql = str(search_database(config).query)
+
+        # Only the cap is ranked, so pages never show more
+        self.assertIn("LIMIT 2", sql)
+
+    def test_relevance_search_weights_title_rank_first(self):
+        config = SearchDocumentConfig("waste", sort_by="relevance")
+
+        sql = str(search_database(config).query)
+
+        # Ranked against the stored per-field vectors, title rank dominant
+        for column in [
+            "title_vector",
+            "description_vector",
+            "regulatory_topics_vector",
+        ]:
+            self.assertIn(
+                f'ts_rank("search_dataresponsemodel"."{column}"', sql
+            )
+        self.assertIn("* 1000", sql)
+
+    @override_settings(SEARCH_RELEVANCE_CANDIDATES=2)
+    @patch("app.search.utils.search.get_search_config")
+    def test_unpaginated_relevance_search_ranks_every_match(
+        self, mock_get_search_config
+    ):
+        mock_get_search_config.return_value = SearchDocumentConfig(
+            "waste", sort_by="relevance"
+        )
+
+        results = search({}, MagicMock(), ignore_pagination=True)
+
+        # Every match beyond the 2 candidates is kept
+        self.assertIn("final_score", results.query.annotations)
+        self.assertNotIn("LIMIT", str(results.query))
+
+    def test_publisher_filter_is_normalised_as_at_ingest(self):
+        config = SearchDocumentConfig(
+            "waste", publisher_names=["Health and Safety Executive"]
+        )
+
+        queryset = search_database(config)
+        _, params = queryset.query.sql_with_params()
+
+        self.assertIn("healthandsafetyexecutive", params)
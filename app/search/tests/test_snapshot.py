@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+from app.search.utils.snapshot import GatewaySnapshot
+
+HEADERS = {"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 00:00:00 GMT"}
+
+
+def _fetch(body, status_code=200, content_hash="hash1"):
+    def fetch_to_file(config, url, path, *args, **kwargs):
+        if status_code != 200:
+            return status_code, {}, None
+        with open(path, "w") as file:
+            file.write(body)
+        return status_code, HEADERS, content_hash
+
+    return fetch_to_file
+
+
+class TestGatewaySnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot = GatewaySnapshot(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _fetch(self, *args, **kwargs):
+        with patch(
+            "app.search.utils.snapshot.fetch_to_file",
+            side_effect=_fetch(*args, **kwargs),
+        ) as mock_fetch:
+            status_code = self.snapshot.fetch(None, "https://example.org")
+        return status_code, mock_fetch
+
+    def test_first_fetch_is_unconditional_and_needs_ingest(self):
+        status_code, mock_fetch = self._fetch('{"rows": []}')
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(mock_fetch.call_args.kwargs["headers"], {})
+        self.assertTrue(self.snapshot.needs_ingest())
+        self.assertEqual("".join(self.snapshot.iter_text(4)), '{"rows": []}')
+
+    def test_fetch_sends_validators(self):
+        self._fetch('{"rows": []}')
+
+        _, mock_fetch = self._fetch("", status_code=304)
+
+        self.assertEqual(
+            mock_fetch.call_args.kwargs["headers"],
+            {
+                "If-None-Match": '"v1"',
+                "If-Modified-Since": "Sat, 17 Oct 2026 00:00:00 GMT",
+            },
+        )
+
+    def test_ingested_snapshot_is_not_ingested_again(self):
+        self._fetch('{"rows": []}')
+        self.snapshot.mark_ingested()
+
+        self.assertEqual(self._fetch("", status_code=304)[0], 304)
+        self.assertFalse(self.snapshot.needs_ingest())
+
+        # A full response with the same content
+        self._fetch('{"rows": []}')
+        self.assertFalse(self.snapshot.needs_ingest())
+
+    def test_changed_content_needs_ingest(self):
+        self._fetch('{"rows": []}')
+        self.snapshot.mark_ingested()
+
+        self._fetch('{"rows": [1]}', content_hash="hash2")
+
+        self.assertTrue(self.snapshot.needs_ingest())
+        self.assertEqual("".join(self.snapshot.iter_text()), '{"rows": [1]}')
+
+    def test_failed_ingest_is_retried(self):
+        self._fetch('{"rows": []}')
+
+        # The last ingest didn't complete
+        self._fetch("", status_code=304)
+
+        self.assertTrue(self.snapshot.needs_ingest())
+
+    def test_failed_fetch_keeps_snapshot(self):
+        self._fetch('{"rows": []}')
+
+        with patch(
+            "app.search.utils.snapshot.fetch_to_file", return_value=None
+        ):
+            self.assertIsNone(self.snapshot.fetch(None, "https://example.org"))
+
+        self.assertEqual("".join(self.snapshot.iter_text()), '{"rows": []}')
@@ -0,0 +1,62 @@
+import unittest
+
+from app.search.utils.spelling import SpellingLexicon, edit_distance
+
+FREQUENCIES = {
+    "water": 10,
+    "waste": 4,
+    "safety": 8,
+    "aviation": 3,
+    "equipment": 5,
+    "environmental": 2,
+}
+
+
+class TestEditDistance(unittest.TestCase):
+
+    def test_edits(self):
+        self.assertEqual(edit_distance("water", "water"), 0)
+        self.assertEqual(edit_distance("watr", "water"), 1)
+        self.assertEqual(edit_distance("wtaer", "water"), 1)
+        self.assertEqual(edit_distance("waiter", "water"), 1)
+        self.assertEqual(edit_distance("wader", "water"), 1)
+        self.assertEqual(edit_distance("", "water"), 5)
+
+
+class TestSpellingLexicon(unittest.TestCase):
+
+    def setUp(self):
+        self.lexicon = SpellingLexicon(FREQUENCIES, max_distance=2)
+
+    def test_known_word_is_unchanged(self):
+        self.assertEqual(self.lexicon.correct("water"), "water")
+
+    def test_closest_term(self):
+        self.assertEqual(self.lexicon.correct("safty"), "safety")
+        self.assertEqual(self.lexicon.correct("equipmnet"), "equipment")
+
+    def test_long_term_beyond_prefix(self):
+        self.assertEqual(
+            self.lexicon.correct("environmantal"), "environmental"
+        )
+
+    def test_ties_prefer_the_most_frequent_term(self):
+        # One edit from both "water" and "waste"
+        self.assertEqual(self.lexicon.correct("wate"), "water")
+
+    def test_too_far_or_too_short(self):
+        self.assertIsNone(self.lexicon.correct("qqqqqq"))
+        self.assertIsNone(self.lexicon.correct("wa"))
+
+    def test_short_words_are_corrected_by_one_edit(self):
+        self.assertIsNone(self.lexicon.correct("wtr"))
+
+    def test_correct_query_keeps_operators_quotes_and_stop_words(self):
+        self.assertEqual(
+            self.lexicon.correct_query('"aviaton safty" AND the watr'),
+            '"aviation safety" AND the water',
+        )
+
+    def test_correct_query_without_corrections(self):
+        self.assertIsNone(self.lexicon.correct_query("water AND safety"))
+        self.assertIsNone(self.lexicon.correct_query("qqqqqq"))
@@ -0,0 +1,67 @@
+import unittest
+
+from app.search.utils.suggest import (
+    PUBLISHER,
+    TITLE_TERM,
+    TOPIC,
+    SuggestIndex,
+    _completions,
+)
+
+DOCUMENTS = [
+    {
+        "title": "Water Safety Regulations",
+        "publisher": "Health and Safety Executive",
+        "regulatory_topics_list": ["water", "health"],
+    },
+    {
+        "title": "Water Hygiene Guidance",
+        "publisher": " Health and Safety Executive ",
+        "regulatory_topics_list": ["water"],
+    },
+    {
+        "title": "Waste Standard",
+        "publisher": "Environment Agency",
+        "regulatory_topics_list": None,
+    },
+]
+
+
+class TestSuggestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SuggestIndex(_completions(DOCUMENTS))
+
+    def test_completions_heaviest_first(self):
+        self.assertEqual(
+            self.index.complete("wa", 10),
+            [
+                {"text": "water", "kind": TITLE_TERM, "count": 2},
+                {"text": "water", "kind": TOPIC, "count": 2},
+                {"text": "waste", "kind": TITLE_TERM, "count": 1},
+            ],
+        )
+
+    def test_limit(self):
+        self.assertEqual(len(self.index.complete("wa", 1)), 1)
+        self.assertEqual(self.index.complete("wa", 0), [])
+
+    def test_prefix_is_normalised(self):
+        self.assertEqual(
+            self.index.complete("  HEALTH   and", 10),
+            [
+                {
+                    "text": "Health and Safety Executive",
+                    "kind": PUBLISHER,
+                    "count": 2,
+                }
+            ],
+        )
+
+    def test_no_completions(self):
+        self.assertEqual(self.index.complete("zz", 10), [])
+        self.assertEqual(self.index.complete("", 10), [])
+
+    def test_stop_words_are_not_title_terms(self):
+        kinds = {result["kind"] for result in self.index.complete("and", 10)}
+        self.assertNotIn(TITLE_TERM, kinds)
@@ -0,0 +1,520 @@
+"""
+In-process BM25 search backend.
+
+Builds a compact inverted index over the title, description and regulatory
+topics of every DataResponseModel row and answers search_database
+equivalent queries (AND/OR/phrase semantics, document type and publisher
+filters, recent/relevance sorting) without querying the database. Only the
+rows of the requested page are fetched, by primary key.
+
+The index is built once per process for each dataset generation, so it is
+rebuilt on first use after a cache rebuild. Enable it with
+SEARCH_BACKEND = "bm25".
+
+Tokenisation is a lower-cased word split with English stop words removed.
+Unlike Postgres full text search no stemming is applied, so results are
+close to, but not identical with, the Postgres backend.
+"""
+
+import logging
+import re
+import time
+
+from bisect import bisect_left
+from typing import Iterator, Optional
+
+import numpy as np
+
+from app.search.config import SearchDocumentConfig
+from app.search.models import DataResponseModel
+from app.search.utils.cache import cached_per_generation
+from app.search.utils.documents import (
+    get_document_type_group,
+    normalise_document_type,
+    normalise_publisher_id,
+)
+
+logger = logging.getLogger(__name__)
+
+# Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Token id separating fields in the stored token stream so that phrases
+# never match across the title, description and regulatory topics
+FIELD_SEPARATOR = -1
+
+# Number of rows fetched per query when iterating over all results
+FETCH_BATCH_SIZE = 500
+
+# Sorts after any character a prefix can end with, so that
+# bisect_left(keys, prefix + PREFIX_END) is the end of the prefix's range
+PREFIX_END = "\U0010ffff"
+
+STOP_WORDS = frozenset(
+    """
+    a about above after again against all am an and any are as at be because
+    been before being below between both but by can did do does doing down
+    during each few for from further had has have having he her here hers
+    herself him himself his how i if in into is it its itself just me more
+    most my myself no nor not now of off on once only or other our ours
+    ourselves out over own same she should so some such than that the their
+    theirs them themselves then there these they this those through to too
+    under until up very was we were what when where which while who whom why
+    will with you your yours yourself yourselves
+    """.split()
+)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """
+    Splits text into lower-cased word tokens, dropping stop words.
+    """
+    if not text:
+        return []
+    return [
+        word
+        for word in _WORD_RE.findall(text.lower())
+        if word not in STOP_WORDS
+    ]
+
+
+class BM25Index:
+    """
+    An immutable inverted index over a set of documents.
+
+    Postings are stored in CSR form: the documents containing term t are
+    postings_docs[postings_offsets[t]:postings_offsets[t + 1]] with the
+    matching term frequencies in postings_tf. Each document's token stream
+    is stored the same way for phrase matching.
+
+    Every suffix of every term is kept in a sorted array, so the terms
+    containing a substring are those with a suffix in the contiguous range
+    starting with it, found by binary search.
+    """
+
+    def __init__(self, documents):
+        """
+        Builds the index.
+
+        Args:
+            documents (Iterable[dict]): Documents with id, title,
+                description, regulatory_topics, type, publisher_id and
+                sort_date keys.
+        """
+        vocabulary: dict[str, int] = {}
+        term_docs: list[list[int]] = []
+        term_tfs: list[list[int]] = []
+        title_term_docs: list[set[int]] = []
+        token_stream: list[int] = []
+        token_offsets = [0]
+        doc_lengths = []
+        ids = []
+        types = []
+        publishers = []
+        sort_dates = []
+
+        for doc_index, document in enumerate(documents):
+            ids.append(document["id"])
+            types.append(normalise_document_type(document.get("type")) or "")
+            publishers.append((document.get("publisher_id") or "").lower())
+            sort_date = document.get("sort_date")
+            sort_dates.append(sort_date.toordinal() if sort_date else -1)
+
+            counts: dict[int, int] = {}
+            length = 0
+            for field in ("title", "description", "regulatory_topics"):
+                for word in tokenize(document.get(field)):
+                    term = vocabulary.get(word)
+                    if term is None:
+                        term = vocabulary[word] = len(vocabulary)
+                        term_docs.append([])
+                        term_tfs.append([])
+                        title_term_docs.append(set())
+                    counts[term] = counts.get(term, 0) + 1
+                    token_stream.append(term)
+                    length += 1
+                    if field == "title":
+                        title_term_docs[term].add(doc_index)
+                token_stream.append(FIELD_SEPARATOR)
+
+            for term, count in counts.items():
+                term_docs[term].append(doc_index)
+                term_tfs[term].append(count)
+
+            doc_lengths.append(length)
+            token_offsets.append(len(token_stream))
+
+        self.vocabulary = vocabulary
+        suffixes = sorted(
+            (word[start:], term)
+            for word, term in vocabulary.items()
+            for start in range(len(word))
+        )
+        self.suffixes = [suffix for suffix, _ in suffixes]
+        self.suffix_terms = np.fromiter(
+            (term for _, term in suffixes), dtype=np.int32, count=len(suffixes)
+        )
+        self.ids = np.array(ids, dtype=object)
+        self.size = len(ids)
+
+        self.postings_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        self.postings_offsets[1:] = np.cumsum([len(d) for d in term_docs])
+        self.postings_docs = np.fromiter(
+            (doc for docs in term_docs for doc in docs),
+            dtype=np.int32,
+            count=int(self.postings_offsets[-1]),
+        )
+        self.postings_tf = np.fromiter(
+            (tf for tfs in term_tfs for tf in tfs),
+            dtype=np.float32,
+            count=int(self.postings_offsets[-1]),
+        )
+        self.title_postings = [
+            np.fromiter(sorted(docs), dtype=np.int32, count=len(docs))
+            for docs in title_term_docs
+        ]
+
+        self.token_stream = np.array(token_stream, dtype=np.int32)
+        self.token_offsets = np.array(token_offsets, dtype=np.int64)
+
+        self.doc_lengths = np.array(doc_lengths, dtype=np.float32)
+        self.avg_doc_length = (
+            float(self.doc_lengths.mean()) if self.size else 0.0
+        )
+        document_frequency = np.diff(self.postings_offsets).astype(np.float32)
+        self.idf = np.log(
+            1.0
+            + (self.size - document_frequency + 0.5)
+            / (document_frequency + 0.5)
+        )
+
+        self.type_names, self.type_codes = np.unique(
+            np.array(types, dtype=object), return_inverse=True
+        )
+        self.publisher_names, self.publisher_codes = np.unique(
+            np.array(publishers, dtype=object), return_inverse=True
+        )
+        self.sort_dates = np.array(sort_dates, dtype=np.int32)
+
+    def _postings(self, term: int) -> tuple[np.ndarray, np.ndarray]:
+        start = self.postings_offsets[term]
+        end = self.postings_offsets[term + 1]
+        return self.postings_docs[start:end], self.postings_tf[start:end]
+
+    def _term_mask(self, term: Optional[int]) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        if term is not None:
+            mask[self._postings(term)[0]] = True
+        return mask
+
+    def _phrase_mask(self, words: list[str]) -> np.ndarray:
+        terms = [self.vocabulary.get(word) for word in words]
+        if any(term is None for term in terms):
+            return np.zeros(self.size, dtype=bool)
+
+        # Documents containing every term of the phrase
+        mask = np.ones(self.size, dtype=bool)
+        for term in terms:
+            mask &= self._term_mask(term)
+        if len(terms) == 1:
+            return mask
+
+        # Keep the documents where the terms appear consecutively
+        for doc in np.flatnonzero(mask):
+            start = self.token_offsets[doc]
+            end = self.token_offsets[doc + 1]
+            tokens = self.token_stream[start:end]
+            positions = np.flatnonzero(
+                tokens[: len(tokens) - len(terms) + 1] == terms[0]
+            )
+            for offset, term in enumerate(terms[1:], start=1):
+                positions = positions[tokens[positions + offset] == term]
+            if not len(positions):
+                mask[doc] = False
+        return mask
+
+    def _leaf_mask(self, token: str) -> Optional[np.ndarray]:
+        """
+        Matches a single plain or quoted phrase token, mirroring
+        plainto_tsquery (all words) and phraseto_tsquery (consecutive
+        words). Returns None for tokens made only of stop words, which
+        Postgres also ignores.
+        """
+        is_phrase = token.startswith('"') and token.endswith('"')
+        words = tokenize(token.strip('"'))
+        if not words:
+            return None
+        if is_phrase:
+            return self._phrase_mask(words)
+
+        mask = np.ones(self.size, dtype=bool)
+        for word in words:
+            mask &= self._term_mask(self.vocabulary.get(word))
+        return mask
+
+    def match(self, tokens) -> Optional[np.ndarray]:
+        """
+        Evaluates compiled search tokens left to right, with implicit OR
+        between terms and explicit AND/OR operators, the same way as the
+        SearchQuery built by the Postgres backend.
+
+        Returns:
+            Optional[np.ndarray]: A boolean mask of matching documents, or
+            None when there are no tokens.
+        """
+        if not tokens:
+            return None
+
+        mask = None
+        operator = "|"
+        for token in tokens:
+            if token.upper() == "AND":
+                operator = "&"
+                continue
+            if token.upper() == "OR":
+                operator = "|"
+                continue
+
+            leaf = self._leaf_mask(token)
+            if leaf is not None:
+                if mask is None:
+                    mask = leaf
+                elif operator == "&":
+                    mask = mask & leaf
+                else:
+                    mask = mask | leaf
+            operator = "|"
+
+        if mask is None:
+            # Only stop words, which match nothing
+            return np.zeros(self.size, dtype=bool)
+        return mask
+
+    def partial_match(self, chunks) -> np.ndarray:
+        """
+        Matches documents containing any indexed word that contains one of
+        the chunks, the in-process equivalent of the partial match fallback.
+        """
+        mask = np.zeros(self.size, dtype=bool)
+        for chunk in chunks:
+            chunk = chunk.lower()
+            start = bisect_left(self.suffixes, chunk)
+            end = bisect_left(self.suffixes, chunk + PREFIX_END, start)
+            for term in np.unique(self.suffix_terms[start:end]):
+                mask[self._postings(term)[0]] = True
+        return mask
+
+    def score(self, tokens) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Scores every document against the search terms.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The BM25 score of each document
+            and whether any of the search terms appear in its title.
+        """
+        scores = np.zeros(self.size, dtype=np.float32)
+        title_match = np.zeros(self.size, dtype=bool)
+
+        words = {
+            word
+            for token in tokens
+            if token.upper() not in ("AND", "OR")
+            for word in tokenize(token.strip('"'))
+        }
+        for word in words:
+            term = self.vocabulary.get(word)
+            if term is None:
+                continue
+            docs, tf = self._postings(term)
+            norm = K1 * (
+                1 - B + B * self.doc_lengths[docs] / self.avg_doc_length
+            )
+            scores[docs] += self.idf[term] * tf * (K1 + 1) / (tf + norm)
+            title_match[self.title_postings[term]] = True
+        return scores, title_match
+
+    def filter_mask(
+        self, document_types=None, publisher_names=None
+    ) -> np.ndarray:
+        """
+        Matches documents whose type or type group, and publisher ID, are
+        one of the requested values, as the Postgres backend does.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if document_types:
+            document_types = {
+                normalise_document_type(doc_type)
+                for doc_type in document_types
+            }
+            codes = [
+                code
+                for code, name in enumerate(self.type_names)
+                if name in document_types
+                or get_document_type_group(name) in document_types
+            ]
+            mask &= np.isin(self.type_codes, codes)
+        if publisher_names:
+            publisher_names = {
+                normalise_publisher_id(publisher)
+                for publisher in publisher_names
+            }
+            codes = [
+                code
+                for code, name in enumerate(self.publisher_names)
+                if name in publisher_names
+            ]
+            mask &= np.isin(self.publisher_codes, codes)
+        return mask
+
+    def search(
+        self, config: SearchDocumentConfig, compiled_query
+    ) -> np.ndarray:
+        """
+        Returns the indexes of the matching documents in result order.
+
+        Args:
+            config (SearchDocumentConfig): A sanitised search configuration.
+            compiled_query (CompiledSearchQuery): The compiled search query.
+        """
+        mask = self.filter_mask(config.document_types, config.publisher_names)
+
+        tokens = compiled_query.tokens
+        strict = self.match(tokens)
+        if config.search_query and not (
+            compiled_query.num_ands
+            or compiled_query.num_ors
+            or compiled_query.num_phrases
+        ):
+            # Fall back to partial matches when nothing matches strictly
+            if strict is None or not (strict & mask).any():
+                strict = self.partial_match(config.search_query.split())
+        if strict is not None:
+            mask &= strict
+
+        matches = np.flatnonzero(mask)
+
+        # Relevance needs a query to rank against, as in the Postgres
+        # backend
+        if config.sort_by == "relevance" and tokens:
+            scores, title_match = self.score(tokens)
+            order = np.lexsort((-scores[matches], ~title_match[matches]))
+        else:
+            # Most recent first, documents without a date last
+            order = np.argsort(-self.sort_dates[matches], kind="stable")
+        return matches[order]
+
+
+class BM25SearchResults:
+    """
+    A lazily fetched, ordered sequence of search results.
+
+    Supports len(), count(), indexing, slicing, iteration and values() so it
+    can be used in place of a QuerySet by Paginator and the CSV download.
+    Only the requested rows are read from the database, by primary key.
+    """
+
+    def __init__(self, ids: np.ndarray, fields: tuple = ()):
+        self._ids = ids
+        self._fields = fields
+
+    @property
+    def ids(self) -> list[str]:
+        """
+        The IDs of the matching documents, in result order.
+        """
+        return self._ids.tolist()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def __bool__(self) -> bool:
+        return len(self._ids) > 0
+
+    def values(self, *fields: str) -> "BM25SearchResults":
+        """
+        Returns the same results, fetched as dicts of the given fields
+        instead of model instances, like QuerySet.values().
+        """
+        return BM25SearchResults(self._ids, fields)
+
+    def _fetch(self, ids) -> list:
+        if self._fields:
+            documents = {
+                document["id"]: document
+                for document in DataResponseModel.objects.filter(
+                    pk__in=list(ids)
+                ).values("id", *self._fields)
+            }
+        else:
+            documents = DataResponseModel.objects.in_bulk(list(ids))
+        return [documents[id] for id in ids if id in documents]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._fetch(self._ids[key])
+        return self._fetch([self._ids[key]])[0]
+
+    def __iter__(self) -> Iterator[DataResponseModel]:
+        for start in range(0, len(self._ids), FETCH_BATCH_SIZE):
+            end = start + FETCH_BATCH_SIZE
+            yield from self[start:end]
+
+
+@cached_per_generation
+def get_bm25_index() -> BM25Index:
+    """
+    Returns the BM25 index for the current dataset generation, building it
+    from DataResponseModel if needed.
+    """
+    start_time = time.time()
+    # Documents are indexed in id order so ties in the result order break on
+    # id, as they do in the Postgres backend
+    documents = (
+        DataResponseModel.objects.values(
+            "id",
+            "title",
+            "description",
+            "regulatory_topics",
+            "type",
+            "publisher_id",
+            "sort_date",
+        )
+        .order_by("id")
+        .iterator(chunk_size=2000)
+    )
+    index = BM25Index(documents)
+    logger.info(
+        f"built BM25 index of {index.size} documents and "
+        f"{len(index.vocabulary)} terms in "
+        f"{round(time.time() - start_time, 2)} seconds"
+    )
+    return index
+
+
+def bm25_search(
+    config: SearchDocumentConfig, compiled_query
+) -> BM25SearchResults:
+    """
+    Answers a search_database query from the in-process BM25 index.
+
+    Args:
+        config (SearchDocumentConfig): A sanitised search configuration.
+        compiled_query (CompiledSearchQuery): The compiled search query.
+
+    Returns:
+        BM25SearchResults: The matching documents in result order.
+    """
+    index = get_bm25_index()
+    start_time = time.time()
+    matches = index.search(config, compiled_query)
+    logger.debug(
+        f"BM25 search matched {len(matches)} documents in "
+        f"{round((time.time() - start_time) * 1000, 3)} ms"
+    )
+    return BM25SearchResults(index.ids[matches])
@@ -0,0 +1,293 @@
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from typing import Callable, Optional, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+
+from app.search.config import SearchDocumentConfig
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DATASET_GENERATION_KEY = "dataset-generation"
+
+# Context keys that make up a cached page of search results
+SEARCH_CACHE_FIELDS = [
+    "results",
+    "results_count",
+    "is_paginated",
+    "results_total_count",
+    "results_page_total",
+    "current_page",
+    "start_index",
+    "end_index",
+    "next_cursor",
+    "prev_cursor",
+    "is_estimate",
+    "results_capped",
+    "suggested_query",
+]
+
+
+def get_dataset_generation() -> int:
+    """
+    Returns the current dataset generation number.
+
+    The generation is bumped after every cache rebuild and is part of every
+    search cache key, so bumping it invalidates all cached search results.
+    If no generation has been recorded yet (or it has been evicted) one is
+    seeded from the current time, so it never repeats an earlier value.
+
+    Returns:
+        int: The current dataset generation number.
+    """
+    try:
+        generation = cache.get(DATASET_GENERATION_KEY)
+        if generation is None:
+            cache.add(DATASET_GENERATION_KEY, int(time.time()), timeout=None)
+            generation = cache.get(DATASET_GENERATION_KEY)
+        return generation
+    except Exception as e:
+        logger.error(f"error getting dataset generation: {e}")
+        return 0
+
+
+def bump_dataset_generation() -> int:
+    """
+    Increments the dataset generation number, invalidating all cached
+    search results.
+
+    Returns:
+        int: The new dataset generation number.
+    """
+    try:
+        generation = cache.incr(DATASET_GENERATION_KEY)
+    except ValueError:
+        # No generation recorded yet
+        generation = int(time.time())
+        cache.set(DATASET_GENERATION_KEY, generation, timeout=None)
+    except Exception as e:
+        logger.error(f"error bumping dataset generation: {e}")
+        return 0
+
+    logger.info(f"dataset generation is now {generation}")
+    return generation
+
+
+def cached_per_generation(builder: Callable[[], T]) -> Callable[[], T]:
+    """
+    Decorator that memoises the result of a zero argument builder in the
+    current process until the dataset generation changes.
+
+    Used for in-process structures derived from the whole dataset (search
+    indexes, catalogues) that only need rebuilding after a cache rebuild.
+    Concurrent callers in the same process wait for a single build.
+
+    The memoised value can be discarded with the wrapper's cache_clear().
+    """
+    lock = threading.Lock()
+    state: dict = {}
+
+    @functools.wraps(builder)
+    def wrapper() -> T:
+        generation = get_dataset_generation()
+        with lock:
+            if "value" not in state or state["generation"] != generation:
+                logger.info(
+                    f"building {builder.__name__} for dataset generation "
+                    f"{generation}"
+                )
+                state["value"] = builder()
+                state["generation"] = generation
+            return state["value"]
+
+    wrapper.cache_clear = state.clear  # type: ignore[attr-defined]
+    return wrapper
+
+
+_warm_lock = threading.Lock()
+_warm_state: dict = {}
+
+
+def warm_per_generation(builders: list[Callable[[], object]]) -> None:
+    """
+    Starts building cached_per_generation structures in a background thread
+    of the current process, once per dataset generation.
+
+    Called on every request of a web worker, so the structures are rebuilt
+    in the process that serves them as soon as it sees a new generation,
+    rather than in the first request that needs them. Requests that need a
+    structure while it is being built wait for that build.
+
+    Args:
+        builders (list): The cached_per_generation builders to call.
+    """
+    generation = get_dataset_generation()
+    with _warm_lock:
+        if _warm_state.get("generation") == generation:
+            return
+        _warm_state["generation"] = generation
+
+    def warm():
+        for builder in builders:
+            try:
+                builder()
+            except Exception as e:
+                logger.error(f"error warming {builder.__name__}: {e}")
+
+    threading.Thread(target=warm, daemon=True).start()
+
+
+def search_cache_key(
+    config: SearchDocumentConfig,
+    prefix: str = "search",
+    include_page: bool = True,
+) -> str:
+    """
+    Builds a cache key from the normalised search configuration and the
+    current dataset generation.
+
+    Document types and publishers are sorted so that the same filters in a
+    different order share a cache entry.
+
+    Args:
+        config (SearchDocumentConfig): A sanitised search configuration.
+        prefix (str): A prefix identifying what is being cached.
+        include_page (bool): Whether the page (offset, limit and cursor)
+            is part of the key. Excluded for values shared by every page of
+            a search, such as the total count.
+
+    Returns:
+        str: The cache key.
+    """
+    normalised_config = {
+        "query": " ".join((config.search_query or "").split()),
+        "document_types": sorted(set(config.document_types or [])),
+        "publisher_names": sorted(set(config.publisher_names or [])),
+        "sort_by": config.sort_by or "recent",
+    }
+    if include_page:
+        normalised_config.update(
+            {
+                "offset": config.offset,
+                "limit": config.limit,
+                "cursor": config.cursor,
+            }
+        )
+    digest = hashlib.sha256(
+        json.dumps(normalised_config, sort_keys=True).encode()
+    ).hexdigest()
+    return f"{prefix}:{get_dataset_generation()}:{digest}"
+
+
+def get_cached_search(
+    context: dict, config: SearchDocumentConfig
+) -> Optional[dict]:
+    """
+    Updates the context with a cached page of search results, if there is
+    one for the search configuration.
+
+    A count-only paginator (no database access) is rebuilt from the cached
+    totals for templates that render page links.
+
+    Args:
+        context (dict): The context dictionary to be updated.
+        config (SearchDocumentConfig): A sanitised search configuration.
+
+    Returns:
+        Optional[dict]: The updated context, or None on a cache miss.
+    """
+    try:
+        cached = cache.get(search_cache_key(config))
+    except Exception as e:
+        logger.error(f"error reading search results from cache: {e}")
+        return None
+
+    if cached is None:
+        logger.debug("search results cache miss")
+        return None
+
+    logger.debug("search results cache hit")
+    context.update(cached)
+
+    # Only the top SEARCH_RELEVANCE_CANDIDATES of a capped search are paged
+    count = cached["results_total_count"]
+    if cached["results_capped"]:
+        count = settings.SEARCH_RELEVANCE_CANDIDATES
+    paginator = Paginator(range(count), config.limit)
+    context["paginator"] = paginator
+    context["paginated_document_results"] = paginator.get_page(
+        cached["current_page"]
+    )
+    return context
+
+
+def set_cached_search(context: dict, config: SearchDocumentConfig) -> None:
+    """
+    Stores the serialisable page of search results from the context in the
+    cache.
+
+    Args:
+        context (dict): The context dictionary built by paginate.
+        config (SearchDocumentConfig): A sanitised search configuration.
+    """
+    try:
+        cache.set(
+            search_cache_key(config),
+            {field: context[field] for field in SEARCH_CACHE_FIELDS},
+            settings.SEARCH_RESULTS_CACHE_TIMEOUT,
+        )
+    except Exception as e:
+        logger.error(f"error writing search results to cache: {e}")
+
+
+def get_cached_count(
+    config: SearchDocumentConfig,
+) -> Optional[tuple[int, bool]]:
+    """
+    Returns the cached total number of results for a search.
+
+    The count is shared by every page of the search, so
+    paging through results only counts them once per dataset generation.
+
+    Args:
+        config (SearchDocumentConfig): A sanitised search configuration.
+
+    Returns:
+        Optional[tuple[int, bool]]: The count and whether it is an estimate,
+            or None on a cache miss.
+    """
+    try:
+        return cache.get(search_cache_key(config, "search-count", False))
+    except Exception as e:
+        logger.error(f"error reading search count from cache: {e}")
+        return None
+
+
+def set_cached_count(
+    config: SearchDocumentConfig, count: int, is_estimate: bool
+) -> None:
+    """
+    Stores the total number of results for a search in the cache.
+
+    Args:
+        config (SearchDocumentConfig): A sanitised search configuration.
+        count (int): The total number of results.
+        is_estimate (bool): Whether the count is the planner's estimate.
+    """
+    try:
+        cache.set(
+            search_cache_key(config, "search-count", False),
+            (count, is_estimate),
+            settings.SEARCH_RESULTS_CACHE_TIMEOUT,
+        )
+    except Exception as e:
+        logger.error(f"error writing search count to cache: {e}")
@@ -1,66 +1,244 @@
 import base64
 import hashlib
+import json
+import logging
+import re
 import uuid
 
-from app.search.models import DataResponseModel, logger
+from typing import NamedTuple
 
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import transaction
+from django.db.models import F, Min
+from django.db.models.functions import Trim
 
-def document_type_groups():
-    import re
-
-    from django.db.models import F
-    from django.db.models.functions import Trim
-
-    from app.search.models import DataResponseModel
-
-    def format_document_type(doc_type):
-        """
-        Format document type string:
-        1. For camel case strings (like EuropeanUnionDecision),
-           insert spaces between words
-        2. For strings with spaces, capitalize each word
-        """
-        # If already contains spaces, just capitalize each word
-        if " " in doc_type:
-            return " ".join(word.capitalize() for word in doc_type.split())
-
-        # For camel case, insert spaces before capital letters and
-        # capitalize first letter
-        formatted = re.sub(r"(?<!^)(?=[A-Z])", " ", doc_type)
-        return formatted
-
-    # Get all distinct document types from the DataResponseModel
-    document_types = (
-        DataResponseModel.objects.values(doc_type=Trim(F("type")))
-        .filter(type__isnull=False)
-        .exclude(type__exact="")
-        .distinct()
-        .order_by("doc_type")
+from app.search.models import DataResponseModel, DocumentType, Publisher
+from app.search.utils.cache import cached_per_generation
+from app.search.utils.date import format_partial_date_govuk
+
+logger = logging.getLogger(__name__)
+
+# Document type groups used by the search filters
+LEGISLATION_GROUP = "legislation"
+GUIDANCE_GROUP = "guidance"
+STANDARD_GROUP = "standard"
+
+
+def normalise_document_type(doc_type):
+    """
+    Normalises a document type for exact matching, as stored in the
+    'type_key' column.
+
+    Args:
+        doc_type (Optional[str]): The document type, e.g. "Primary
+            Legislation".
+
+    Returns:
+        Optional[str]: The trimmed, lower case document type, or None if
+            there is no document type.
+    """
+    if doc_type is None:
+        return None
+    return doc_type.strip().lower() or None
+
+
+def normalise_publisher_id(publisher):
+    """
+    Normalises a publisher name or ID for exact matching, as stored in the
+    'publisher_id' column.
+
+    Args:
+        publisher (Optional[str]): The publisher, e.g. "Health and Safety
+            Executive" or "healthandsafetyexecutive".
+
+    Returns:
+        Optional[str]: The lower case publisher with everything but letters
+            and digits removed, or None if there is no publisher.
+    """
+    if publisher is None:
+        return None
+    return re.sub(r"[^a-zA-Z0-9]", "", publisher.replace(" ", "").lower())
+
+
+def get_document_type_group(doc_type):
+    """
+    Returns the group a document type is filtered under, as stored in the
+    'type_group' column.
+
+    Standards and guidance are grouped by name, every other document type
+    is legislation.
+
+    Args:
+        doc_type (Optional[str]): The document type.
+
+    Returns:
+        Optional[str]: The document type group, or None if there is no
+            document type.
+    """
+    type_key = normalise_document_type(doc_type)
+    if type_key is None:
+        return None
+    if STANDARD_GROUP in type_key:
+        return STANDARD_GROUP
+    if GUIDANCE_GROUP in type_key:
+        return GUIDANCE_GROUP
+    return LEGISLATION_GROUP
+
+
+def format_document_type(doc_type):
+    """
+    Format document type string:
+    1. For camel case strings (like EuropeanUnionDecision),
+       insert spaces between words
+    2. For strings with spaces, capitalize each word
+    """
+    # If already contains spaces, just capitalize each word
+    if " " in doc_type:
+        return " ".join(word.capitalize() for word in doc_type.split())
+
+    # For camel case, insert spaces before capital letters and
+    # capitalize first letter
+    formatted = re.sub(r"(?<!^)(?=[A-Z])", " ", doc_type)
+    return formatted
+
+
+def label_document_type(doc_type):
+    """
+    Returns the display label of a document type, as stored in the
+    'type_label' column.
+
+    Args:
+        doc_type (Optional[str]): The document type.
+
+    Returns:
+        Optional[str]: The display label, or None if there is no document
+            type.
+    """
+    if normalise_document_type(doc_type) is None:
+        return None
+    return format_document_type(doc_type.strip())
+
+
+@cached_per_generation
+def document_type_labels():
+    """
+    Returns a map from each catalogued document type, by its normalised
+    'type_key', to its display label and group.
+
+    Built once per dataset generation from the DocumentType catalogue.
+
+    Returns:
+        dict[str, tuple[str, str]]: The (label, group) of each document
+            type.
+    """
+    return {
+        document_type.type_key: (document_type.label, document_type.group)
+        for document_type in DocumentType.objects.all()
+    }
+
+
+def get_document_type_label(doc_type):
+    """
+    Returns the display label of a document type from the catalogue, for
+    documents without a stored 'type_label'.
+
+    Args:
+        doc_type (Optional[str]): The document type.
+
+    Returns:
+        Optional[str]: The display label, or the document type itself if it
+            isn't catalogued.
+    """
+    label_and_group = document_type_labels().get(
+        normalise_document_type(doc_type)
     )
-    # Categorize document types
+    return label_and_group[0] if label_and_group else doc_type
+
+
+@cached_per_generation
+def document_type_groups():
+    """
+    Returns the document types from the DocumentType catalogue, split into
+    legislation and non-legislation (guidance and standards).
+
+    The catalogue is rebuilt at ingest by refresh_catalogues and held in
+    the process until the dataset generation changes.
+
+    Returns:
+        tuple[list[dict], list[dict]]: The legislation and non-legislation
+            document types, each a dict with "label" and "name" keys,
+            ordered by name.
+    """
     non_legislation = []
     legislation = []
-    for item in document_types:
-        if item and item.get("doc_type") is not None:
-            doc_type = item["doc_type"]
-            formatted_type = format_document_type(doc_type)
-            display_item = {
-                "label": formatted_type,
-                "name": doc_type,
-            }
-
-            if (
-                "standard" in doc_type.lower()
-                or "guidance" in doc_type.lower()
-            ):
-                # Add to non-legislation
-                non_legislation.append(display_item)
-            else:
-                # Add to legislation
-                legislation.append(display_item)
+    for document_type in DocumentType.objects.order_by("name"):
+        display_item = {
+            "label": document_type.label,
+            "name": document_type.name,
+        }
+
+        if document_type.group != LEGISLATION_GROUP:
+            # Add to non-legislation
+            non_legislation.append(display_item)
+        else:
+            # Add to legislation
+            legislation.append(display_item)
     return legislation, non_legislation
 
 
+def refresh_catalogues():
+    """
+    Rebuilds the DocumentType and Publisher catalogues from the documents
+    in the 'DataResponseModel' table.
+
+    Called after every cache rebuild, so the DISTINCT queries over the
+    documents run once per ingest rather than once per request.
+
+    Returns:
+        tuple[int, int]: The number of document types and publishers.
+    """
+    logger.debug("refreshing document type and publisher catalogues...")
+    try:
+        document_types = [
+            DocumentType(
+                type_key=item["type_key"],
+                name=item["name"],
+                label=label_document_type(item["name"]),
+                group=get_document_type_group(item["name"]),
+            )
+            for item in DataResponseModel.objects.filter(
+                type_key__isnull=False
+            )
+            .values("type_key")
+            .annotate(name=Min(Trim(F("type"))))
+        ]
+        publishers = [
+            Publisher(publisher_id=item["publisher_id"], name=item["name"])
+            for item in DataResponseModel.objects.filter(
+                publisher_id__isnull=False, publisher__isnull=False
+            )
+            .exclude(publisher_id__exact="")
+            .values("publisher_id")
+            .annotate(name=Min(Trim(F("publisher"))))
+        ]
+
+        with transaction.atomic():
+            DocumentType.objects.all().delete()
+            DocumentType.objects.bulk_create(document_types)
+            Publisher.objects.all().delete()
+            Publisher.objects.bulk_create(publishers)
+
+        logger.debug(
+            f"catalogues refreshed with {len(document_types)} document types "
+            f"and {len(publishers)} publishers"
+        )
+        return len(document_types), len(publishers)
+    except Exception as e:
+        logger.error(f"error refreshing catalogues: {e}")
+        return 0, 0
+
+
 def clear_all_documents():
     """
     Clears all documents from the 'DataResponseModel' table in the database.
@@ -80,6 +258,60 @@ def clear_all_documents():
         logger.error(f"error clearing documents: {e}")
 
 
+def update_search_vectors(model=None, ids=None, raise_errors=False):
+    """
+    Populates the stored search vector columns for every document in the
+    'DataResponseModel' table, or the given model's table.
+
+    The vectors are built once at ingest time so that searches can filter
+    and rank on stored, indexed columns rather than running 'to_tsvector'
+    over every row per request:
+    - title_vector, description_vector and regulatory_topics_vector hold
+      each field on its own, weighted A, B and C respectively.
+    - search_vector holds the three weighted vectors combined and is the
+      GIN indexed column used for matching and relevance ranking.
+
+    Args:
+        model (optional): The model to update, defaults to
+            DataResponseModel.
+        ids (list[str], optional): Only update these documents.
+        raise_errors (bool, optional): Raise database errors instead of
+            logging them, as needed inside a transaction, which an error
+            aborts.
+
+    Returns:
+        int: The number of documents updated.
+    """
+    logger.debug("updating search vectors...")
+    model = model or DataResponseModel
+    try:
+        title_vector = SearchVector("title", weight="A")
+        description_vector = SearchVector("description", weight="B")
+        regulatory_topics_vector = SearchVector(
+            "regulatory_topics", weight="C"
+        )
+
+        documents = model.objects.all()
+        if ids is not None:
+            documents = documents.filter(pk__in=ids)
+
+        updated = documents.update(
+            title_vector=title_vector,
+            description_vector=description_vector,
+            regulatory_topics_vector=regulatory_topics_vector,
+            search_vector=(
+                title_vector + description_vector + regulatory_topics_vector
+            ),
+        )
+        logger.debug(f"search vectors updated for {updated} documents")
+        return updated
+    except Exception as e:
+        logger.error(f"error updating search vectors: {e}")
+        if raise_errors:
+            raise
+        return 0
+
+
 def insert_or_update_document(document_json):
     """
     Inserts or updates a database document based on the given JSON data.
@@ -118,6 +350,313 @@ def insert_or_update_document(document_json):
         return False
 
 
+def _create_documents(model, documents, update=False):
+    """
+    Inserts a batch of validated documents with a single bulk INSERT, or
+    one at a time if the batch fails, so one bad row doesn't lose the rest
+    of the batch. When update is set, existing documents with the same IDs
+    are updated (INSERT ... ON CONFLICT DO UPDATE).
+
+    Returns:
+        tuple[int, list[dict]]: The number of documents inserted and the
+            failures, each a dict with "id" and "error" keys.
+    """
+    try:
+        with transaction.atomic():
+            if update:
+                model.objects.bulk_create(
+                    documents,
+                    update_conflicts=True,
+                    unique_fields=[model._meta.pk.name],
+                    update_fields=[
+                        field.name
+                        for field in model._meta.concrete_fields
+                        if not field.primary_key
+                    ],
+                )
+            else:
+                model.objects.bulk_create(documents)
+        return len(documents), []
+    except Exception as e:
+        logger.error(f"error bulk inserting documents, retrying singly: {e}")
+
+    inserted = 0
+    failures = []
+    for document in documents:
+        try:
+            with transaction.atomic():
+                document.save(force_insert=not update)
+            inserted += 1
+        except Exception as e:
+            failures.append({"id": document.id, "error": str(e)})
+    return inserted, failures
+
+
+def insert_documents(
+    documents_json, batch_size=None, model=None, update=False
+):
+    """
+    Validates and inserts documents in batches.
+
+    Each document is validated on its own, without the per-row uniqueness
+    queries (the primary key is enforced by the database), and each batch
+    is written with one bulk INSERT rather than a round trip per document.
+    As with insert_or_update_document, the first document with a given ID
+    is kept.
+
+    Args:
+        documents_json (Iterable[dict]): The documents to insert.
+        batch_size (int, optional): The number of documents per INSERT,
+            defaults to INGEST_BATCH_SIZE.
+        model (optional): The model to insert into, defaults to
+            DataResponseModel.
+        update (bool, optional): Update documents that already exist
+            instead of failing them.
+
+    Returns:
+        tuple[int, list[dict]]: The number of documents inserted and the
+            documents that failed, each a dict with "id" and "error" keys.
+    """
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+    model = model or DataResponseModel
+    inserted = 0
+    failures = []
+    seen_ids = set()
+    batch = []
+
+    def flush():
+        nonlocal inserted, batch
+        batch_inserted, batch_failures = _create_documents(
+            model, batch, update
+        )
+        inserted += batch_inserted
+        failures.extend(batch_failures)
+        logger.info(f"inserted {inserted} documents")
+        batch = []
+
+    for document_json in documents_json:
+        document_id = document_json.get("id")
+        if document_id in seen_ids:
+            failures.append(
+                {"id": document_id, "error": "document already exists"}
+            )
+            continue
+
+        try:
+            document = model(**document_json)
+            document.full_clean(
+                validate_unique=False, validate_constraints=False
+            )
+        except Exception as e:
+            failures.append({"id": document_id, "error": str(e)})
+            continue
+
+        seen_ids.add(document_id)
+        batch.append(document)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    for failure in failures:
+        logger.error(
+            f"error inserting document {failure['id']}: {failure['error']}"
+        )
+    return inserted, failures
+
+
+def ingest_error(loaded, failures):
+    """
+    Returns why an ingest should not replace the stored documents.
+
+    Args:
+        loaded (int): The number of documents the ingest would leave.
+        failures (list[dict]): The documents that failed to load.
+
+    Returns:
+        Optional[str]: The reason, or None if the ingest can be kept.
+    """
+    if not loaded:
+        return "no documents were loaded"
+
+    total = loaded + len(failures)
+    if len(failures) > total * settings.INGEST_MAX_FAILURE_RATIO:
+        return f"{len(failures)} of {total} documents failed to load"
+    return None
+
+
+class DocumentChanges(NamedTuple):
+    """
+    The differences between an ingest and the stored documents.
+
+    Attributes:
+        changed: The new and changed documents.
+        deleted: The IDs of the stored documents missing from the ingest.
+        counts: The number of documents inserted, updated, deleted and
+            unchanged.
+    """
+
+    changed: list
+    deleted: list
+    counts: dict
+
+
+def get_content_hashes():
+    """
+    Returns the stored content hash of each document in the
+    'DataResponseModel' table, by ID.
+    """
+    return dict(DataResponseModel.objects.values_list("id", "content_hash"))
+
+
+def diff_documents(documents_json, stored_hashes) -> DocumentChanges:
+    """
+    Compares the documents of an ingest, with their 'content_hash', with
+    the stored content hashes.
+
+    Args:
+        documents_json (list[dict]): The documents being ingested.
+        stored_hashes (dict[str, str]): The stored content hash of each
+            document, by ID.
+
+    Returns:
+        DocumentChanges: The new and changed documents, and the IDs of the
+            documents to delete.
+    """
+    changed = []
+    ids = set()
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    for document_json in documents_json:
+        document_id = document_json.get("id")
+        if document_id in ids:
+            # Duplicates are reported by insert_documents
+            changed.append(document_json)
+            continue
+        ids.add(document_id)
+
+        if document_id not in stored_hashes:
+            counts["inserted"] += 1
+        elif stored_hashes[document_id] != document_json["content_hash"]:
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+            continue
+        changed.append(document_json)
+
+    deleted = [
+        document_id for document_id in stored_hashes if document_id not in ids
+    ]
+    counts["deleted"] = len(deleted)
+    return DocumentChanges(changed, deleted, counts)
+
+
+def apply_document_changes(changes: DocumentChanges):
+    """
+    Upserts the new and changed documents and deletes the missing ones in
+    the 'DataResponseModel' table, in one transaction, then updates their
+    search vectors.
+
+    Only the changed rows are written, so the cost of an ingest (and its
+    index and WAL churn) scales with the amount of change. If too many
+    documents fail (see ingest_error) the transaction is rolled back and
+    the stored documents are kept. A database error updating the search
+    vectors is raised, also rolling the transaction back.
+
+    Args:
+        changes (DocumentChanges): The changes to apply.
+
+    Returns:
+        tuple[list[dict], Optional[str]]: The documents that failed, each a
+            dict with "id" and "error" keys, and why the changes were
+            rolled back, or None if they were applied.
+    """
+    with transaction.atomic():
+        written, failures = insert_documents(changes.changed, update=True)
+        error = ingest_error(changes.counts["unchanged"] + written, failures)
+        if error:
+            transaction.set_rollback(True)
+            return failures, error
+
+        DataResponseModel.objects.filter(pk__in=changes.deleted).delete()
+        update_search_vectors(
+            ids=[document_json["id"] for document_json in changes.changed],
+            raise_errors=True,
+        )
+    return failures, None
+
+
+def get_display_fields(document_json, related_legislation):
+    """
+    Returns the ready to render display fields of a document.
+
+    Computed once at ingest time so that serialising search results and
+    documents doesn't parse dates, topics or related legislation per
+    request.
+
+    Args:
+        document_json (dict): The document being ingested, with its
+            source_date_* and regulatory_topics fields.
+        related_legislation (list): The document's related legislation.
+
+    Returns:
+        dict: The display_date_issued, display_date_modified,
+            display_date_valid, regulatory_topics_list and
+            related_legislation_list fields.
+    """
+    regulatory_topics = document_json.get("regulatory_topics")
+
+    is_valid_related_legislation, err_msg = validate_related_legislation(
+        related_legislation
+    )
+    if not is_valid_related_legislation:
+        logger.error(f"related legislation validation error: {err_msg}")
+
+    return {
+        "display_date_issued": format_partial_date_govuk(
+            document_json.get("source_date_issued")
+        ),
+        "display_date_modified": format_partial_date_govuk(
+            document_json.get("source_date_modified")
+        ),
+        "display_date_valid": format_partial_date_govuk(
+            document_json.get("source_date_valid")
+        ),
+        "regulatory_topics_list": (
+            str(regulatory_topics).split("\n") if regulatory_topics else None
+        ),
+        "related_legislation_list": (
+            related_legislation
+            if is_valid_related_legislation and related_legislation
+            else None
+        ),
+    }
+
+
+def generate_hash(text: str) -> str:
+    """
+    Returns the hex encoded sha256 hash of a string.
+    """
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def content_hash(document_json) -> str:
+    """
+    Returns a hash of a document's fields, stored in its 'content_hash'
+    column so that a later ingest can tell whether the document changed.
+
+    Args:
+        document_json (dict): The document being ingested, without its
+            'content_hash'.
+
+    Returns:
+        str: The hex encoded sha256 hash of the document's fields.
+    """
+    return generate_hash(
+        json.dumps(document_json, sort_keys=True, default=str)
+    )
+
+
 def generate_uuid(text: str = "", short: bool = True) -> str:
     """
     Generates a short, unique identifier (UUID) in base64 format, optionally
@@ -142,12 +681,9 @@ def generate_uuid(text: str = "", short: bool = True) -> str:
     def _is_id_valid(id: str) -> bool:
         return isinstance(id, str) and bool(id)
 
-    def _generate_hash(text: str) -> str:
-        return hashlib.sha256(text.encode()).hexdigest()
-
     # If id is provided, use it to generate the UUID using a hash function
     if _is_id_valid(text):
-        hash_value = _generate_hash(text)
+        hash_value = generate_hash(text)
         return hash_value[
             :22
         ]  # Shorten as needed, typically more than 22 characters are
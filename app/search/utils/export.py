@@ -0,0 +1,163 @@
+import csv
+import json
+import logging
+import zlib
+
+from typing import Iterable, Iterator, Sequence
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+EXPORT_NDJSON = "ndjson"
+EXPORT_CSV_GZIP = "csv.gz"
+EXPORT_FORMATS = (EXPORT_NDJSON, EXPORT_CSV_GZIP)
+
+# Exported columns and the names they are exported as
+EXPORT_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "identifier": "identifier",
+    "publisher": "publisher",
+    "publisher_id": "publisher_id",
+    "description": "description",
+    "type": "type",
+    "type_label": "type_label",
+    "type_group": "type_group",
+    "source_date_issued": "source_date_issued",
+    "source_date_modified": "source_date_modified",
+    "source_date_valid": "source_date_valid",
+    "regulatory_topics_list": "regulatory_topics",
+}
+
+# Gzip container (rather than raw zlib) for zlib.compressobj
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+class Echo:
+    """
+    A file-like object that returns what is written to it, so csv.writer
+    can format rows for a streaming response without buffering them.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_results(results, fields: Sequence[str]) -> Iterator[tuple]:
+    """
+    Iterates over search results as tuples of the given fields, reading
+    them from the database in chunks so memory use doesn't grow with the
+    number of results.
+
+    Args:
+        results (QuerySet | BM25SearchResults): The ordered search results.
+        fields (Sequence[str]): The fields to read.
+
+    Yields:
+        tuple: The values of the fields for each result.
+    """
+    if isinstance(results, QuerySet):
+        yield from results.values_list(*fields).iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE
+        )
+    else:
+        # In-memory search backends fetch their rows in batches
+        for row in results.values(*fields):
+            yield tuple(row[field] for field in fields)
+
+
+def stream_csv(header: Sequence[str], rows: Iterable[Sequence]):
+    """
+    Yields CSV formatted lines, the header first, one row at a time.
+
+    Args:
+        header (Sequence[str]): The column names.
+        rows (Iterable[Sequence]): The rows.
+
+    Yields:
+        str: Each CSV formatted line.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(names: Sequence[str], rows: Iterable[Sequence]):
+    """
+    Yields newline delimited JSON, one object per row.
+
+    Args:
+        names (Sequence[str]): The object keys, in row order.
+        rows (Iterable[Sequence]): The rows.
+
+    Yields:
+        str: Each JSON object followed by a newline.
+    """
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def gzip_stream(chunks: Iterable[str]):
+    """
+    Gzip compresses a stream of text as it is produced.
+
+    Args:
+        chunks (Iterable[str]): The text to compress.
+
+    Yields:
+        bytes: The compressed stream.
+    """
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode())
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _csv_export_rows(rows: Iterable[Sequence]):
+    # Regulatory topics are exported one per line in a single cell
+    topics = list(EXPORT_FIELDS).index("regulatory_topics_list")
+    for row in rows:
+        row = list(row)
+        row[topics] = "\n".join(row[topics] or [])
+        yield row
+
+
+def export_response(results, export_format: str) -> StreamingHttpResponse:
+    """
+    Streams every search result as newline delimited JSON or gzip
+    compressed CSV.
+
+    Results are read from the database in chunks of EXPORT_CHUNK_SIZE, so
+    memory use stays flat however many documents match.
+
+    Args:
+        results (QuerySet | BM25SearchResults): The ordered search results.
+        export_format (str): EXPORT_NDJSON or EXPORT_CSV_GZIP.
+
+    Returns:
+        StreamingHttpResponse: The export.
+    """
+    names = list(EXPORT_FIELDS.values())
+    rows = iter_results(results, list(EXPORT_FIELDS))
+
+    if export_format == EXPORT_CSV_GZIP:
+        response = StreamingHttpResponse(
+            gzip_stream(stream_csv(names, _csv_export_rows(rows))),
+            content_type="application/gzip",
+        )
+        filename = "search_results.csv.gz"
+    else:
+        response = StreamingHttpResponse(
+            stream_ndjson(names, rows), content_type="application/x-ndjson"
+        )
+        filename = "search_results.ndjson"
+
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,190 @@
+import copy
+import logging
+import time
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Min, QuerySet, Value
+from django.db.models.functions import Trim
+
+from app.search.config import SearchDocumentConfig
+from app.search.models import DataResponseModel
+from app.search.utils.cache import search_cache_key
+from app.search.utils.documents import (
+    GUIDANCE_GROUP,
+    LEGISLATION_GROUP,
+    STANDARD_GROUP,
+    format_document_type,
+    normalise_document_type,
+    normalise_publisher_id,
+)
+from app.search.utils.search import search_database
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_TYPE_GROUPS = [LEGISLATION_GROUP, GUIDANCE_GROUP, STANDARD_GROUP]
+
+
+def _facet_rows(config: SearchDocumentConfig) -> list[dict]:
+    """
+    Returns the number of documents matching the search query, ignoring
+    the type and publisher filters, for each combination of document type,
+    publisher and match tier (0 = strict, 1 = partial), in a single grouped
+    query.
+    """
+    unfiltered_config = copy.copy(config)
+    unfiltered_config.document_types = None
+    unfiltered_config.publisher_names = None
+    unfiltered_config.sort_by = None
+
+    # Both match tiers are kept, the best tier depends on the filters
+    matches = search_database(unfiltered_config, tiered=False)
+    if not isinstance(matches, QuerySet):
+        # In-memory search backends return the matching IDs in order
+        matches = DataResponseModel.objects.filter(pk__in=matches.ids)
+    if "match_tier" not in matches.query.annotations:
+        matches = matches.annotate(match_tier=Value(0))
+
+    return list(
+        matches.order_by()
+        .values("type_key", "type_group", "publisher_id", "match_tier")
+        .annotate(
+            type_name=Min(Trim(F("type"))),
+            publisher_name=Min(Trim(F("publisher"))),
+            count=Count("id"),
+        )
+    )
+
+
+def get_facets(config: SearchDocumentConfig) -> dict:
+    """
+    Counts the documents matching a search for each document type, document
+    type group and publisher.
+
+    Counts are disjunctive, as the filters are: document type and group
+    counts apply the publisher filter but not the document type filter, and
+    publisher counts apply the document type filter but not the publisher
+    filter. So each count is the number of results the search would have
+    with that value also checked.
+
+    A search only returns partial matches when there are no strict matches,
+    so each count (and the total) only counts the documents in the best
+    match tier among those it is taken over, as the search filtered on that
+    value would.
+
+    Facets are cached with the search results for the current dataset
+    generation.
+
+    Args:
+        config (SearchDocumentConfig): A sanitised search configuration.
+
+    Returns:
+        dict: The total number of results and lists of document types,
+            document type groups and publishers, each with a count.
+    """
+    key = search_cache_key(config, "facets", include_page=False)
+    try:
+        facets = cache.get(key)
+        if facets is not None:
+            logger.debug("search facets cache hit")
+            return facets
+    except Exception as e:
+        logger.error(f"error reading search facets from cache: {e}")
+
+    start_time = time.time()
+
+    document_types = {
+        normalise_document_type(doc_type)
+        for doc_type in config.document_types or []
+    }
+    publisher_names = {
+        normalise_publisher_id(publisher)
+        for publisher in config.publisher_names or []
+    }
+
+    # The groups of documents (total, type, type group or publisher) each
+    # row is counted in
+    row_groups = []
+    type_counts: dict = {}
+    publisher_counts: dict = {}
+    for row in _facet_rows(config):
+        type_selected = not document_types or bool(
+            {row["type_key"], row["type_group"]} & document_types
+        )
+        publisher_selected = (
+            not publisher_names or row["publisher_id"] in publisher_names
+        )
+
+        groups = []
+        if type_selected and publisher_selected:
+            groups.append(("total", None))
+
+        if publisher_selected and row["type_key"]:
+            groups += [("type", row["type_key"]), ("group", row["type_group"])]
+            type_counts.setdefault(
+                row["type_key"],
+                {
+                    "name": row["type_name"],
+                    "label": format_document_type(row["type_name"]),
+                    "group": row["type_group"],
+                    "count": 0,
+                },
+            )
+
+        if type_selected and row["publisher_id"]:
+            groups.append(("publisher", row["publisher_id"]))
+            publisher_counts.setdefault(
+                row["publisher_id"],
+                {
+                    "name": row["publisher_id"],
+                    "label": row["publisher_name"],
+                    "count": 0,
+                },
+            )
+
+        row_groups.append((row, groups))
+
+    best_tiers: dict = {}
+    for row, groups in row_groups:
+        for group in groups:
+            best_tiers[group] = min(
+                best_tiers.get(group, row["match_tier"]), row["match_tier"]
+            )
+
+    counts: dict = defaultdict(int)
+    for row, groups in row_groups:
+        for group in groups:
+            if row["match_tier"] == best_tiers[group]:
+                counts[group] += row["count"]
+
+    for type_key, type_facet in type_counts.items():
+        type_facet["count"] = counts[("type", type_key)]
+    for publisher_id, publisher_facet in publisher_counts.items():
+        publisher_facet["count"] = counts[("publisher", publisher_id)]
+
+    facets = {
+        "results_total_count": counts[("total", None)],
+        "document_types": sorted(
+            type_counts.values(), key=lambda facet: facet["label"]
+        ),
+        "document_type_groups": [
+            {"name": group, "count": counts[("group", group)]}
+            for group in DOCUMENT_TYPE_GROUPS
+        ],
+        "publishers": sorted(
+            publisher_counts.values(), key=lambda facet: facet["label"]
+        ),
+    }
+
+    logger.debug(
+        f"time taken to count search facets: "
+        f"{round(time.time() - start_time, 2)} seconds"
+    )
+
+    try:
+        cache.set(key, facets, settings.SEARCH_RESULTS_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.error(f"error writing search facets to cache: {e}")
+    return facets
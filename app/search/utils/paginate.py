@@ -1,18 +1,304 @@
+import base64
+import copy
+import datetime
+import json
 import logging
 import time
 
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import QuerySet
+from typing import Optional
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
 
 from app.search.config import SearchDocumentConfig
-from app.search.utils.date import format_partial_date_govuk
-from app.search.utils.documents import document_type_groups
+from app.search.utils.cache import get_cached_count, set_cached_count
+from app.search.utils.results import SearchResult, project_results
 
 logger = logging.getLogger(__name__)
 
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+
+def encode_cursor(direction: str, keys: list, index: int) -> str:
+    """
+    Encodes an opaque pagination cursor.
+
+    Args:
+        direction (str): CURSOR_NEXT or CURSOR_PREV.
+        keys (list): The sort key values of the row to seek from.
+        index (int): The zero based position of the first row of the page
+            the cursor leads to.
+
+    Returns:
+        str: The URL safe cursor.
+    """
+    payload = json.dumps(
+        {"d": direction, "k": keys, "i": index}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[dict]:
+    """
+    Decodes a pagination cursor created by encode_cursor.
+
+    Args:
+        cursor (str): The cursor from the request.
+
+    Returns:
+        Optional[dict]: The cursor payload, or None if the cursor is invalid.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if (
+            payload["d"] not in (CURSOR_NEXT, CURSOR_PREV)
+            or not isinstance(payload["k"], list)
+            or not isinstance(payload["i"], int)
+            or payload["i"] < 0
+        ):
+            raise ValueError("unexpected cursor payload")
+        return payload
+    except Exception as e:
+        logger.error(f"error decoding pagination cursor: {e}")
+        return None
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Returns the query planner's estimate of the number of rows a query set
+    returns, without running it.
+
+    Args:
+        queryset (QuerySet): The query set to estimate.
+
+    Returns:
+        Optional[int]: The estimated number of rows, or None on error.
+    """
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.error(f"error estimating search results count: {e}")
+        return None
+
+
+class SearchPaginator(Paginator):
+    """
+    Paginator whose total count is cached per search and dataset
+    generation.
+
+    When SEARCH_COUNT_ESTIMATE_THRESHOLD is set and the planner estimates
+    at least that many results, the estimate is used as the count instead
+    of running a COUNT over the whole result set, and is_estimate is set.
+    """
+
+    def __init__(self, object_list, per_page, config, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.config = config
+        self.is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            # In-memory results know their length
+            return len(self.object_list)
+
+        cached_count = get_cached_count(self.config)
+        if cached_count is not None:
+            count, self.is_estimate = cached_count
+            return count
+
+        count = None
+        threshold = settings.SEARCH_COUNT_ESTIMATE_THRESHOLD
+        if threshold:
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= threshold:
+                logger.debug(f"using estimated results count: {estimate}")
+                count = estimate
+                self.is_estimate = True
+
+        if count is None:
+            count = self.object_list.count()
+
+        set_cached_count(self.config, count, self.is_estimate)
+        return count
+
+
+def _is_ranked(results: QuerySet) -> bool:
+    return "final_score" in results.query.annotations
+
+
+def _may_be_capped(results, paginator: SearchPaginator) -> bool:
+    """
+    Returns whether relevance ranked results may have been limited to the
+    top SEARCH_RELEVANCE_CANDIDATES matches, because as many were ranked.
+    """
+    cap = settings.SEARCH_RELEVANCE_CANDIDATES
+    return bool(
+        cap
+        and isinstance(results, QuerySet)
+        and _is_ranked(results)
+        and paginator.count >= cap
+    )
+
+
+def _match_count(
+    config: SearchDocumentConfig, matches: QuerySet
+) -> tuple[int, bool]:
+    """
+    Returns the number of documents matching a search, and whether it is an
+    estimate.
+
+    The matches aren't ranked, so they are counted (and the count cached)
+    as for the same search sorted by most recent.
+    """
+    recent_config = copy.copy(config)
+    recent_config.sort_by = None
+    paginator = SearchPaginator(matches, config.limit, recent_config)
+    return paginator.count, paginator.is_estimate
+
+
+def _cursor_keys(results: QuerySet, document) -> list:
+    """
+    Returns the sort key values of a document, in the order the results are
+    sorted by.
+    """
+    if _is_ranked(results):
+        return [document.has_title_match, document.final_score, document.id]
+
+    sort_date = document.sort_date
+    return [sort_date.isoformat() if sort_date else None, document.id]
+
+
+def _seek_filter(results: QuerySet, direction: str, keys: list) -> Q:
+    """
+    Builds the filter selecting the rows after (CURSOR_NEXT) or before
+    (CURSOR_PREV) the given sort keys.
+
+    Results are ordered by (has_title_match desc, final_score desc, id) when
+    ranked by relevance, otherwise by (sort_date desc nulls last, id).
+    """
+    forward = direction == CURSOR_NEXT
+
+    if _is_ranked(results):
+        title_match, score, document_id = keys
+        if forward:
+            return (
+                Q(has_title_match__lt=title_match)
+                | Q(has_title_match=title_match, final_score__lt=score)
+                | Q(
+                    has_title_match=title_match,
+                    final_score=score,
+                    id__gt=document_id,
+                )
+            )
+        return (
+            Q(has_title_match__gt=title_match)
+            | Q(has_title_match=title_match, final_score__gt=score)
+            | Q(
+                has_title_match=title_match,
+                final_score=score,
+                id__lt=document_id,
+            )
+        )
+
+    sort_date, document_id = keys
+    if sort_date is None:
+        # Undated documents are sorted last
+        if forward:
+            return Q(sort_date__isnull=True, id__gt=document_id)
+        return Q(sort_date__isnull=False) | Q(
+            sort_date__isnull=True, id__lt=document_id
+        )
+
+    sort_date = datetime.date.fromisoformat(sort_date)
+    if forward:
+        return (
+            Q(sort_date__lt=sort_date)
+            | Q(sort_date=sort_date, id__gt=document_id)
+            | Q(sort_date__isnull=True)
+        )
+    return Q(sort_date__gt=sort_date) | Q(
+        sort_date=sort_date, id__lt=document_id
+    )
+
+
+def _page_from_cursor(
+    paginator: SearchPaginator, results, limit: int, cursor: dict
+) -> Page:
+    """
+    Returns the page a cursor leads to.
+
+    Query sets are read by seeking from the cursor's sort keys, so the
+    database doesn't scan and discard the rows of earlier pages. Other
+    results (in-memory search backends) are sliced by position.
+    """
+    index = cursor["i"]
+    number = index // limit + 1
+
+    if not isinstance(results, QuerySet):
+        end = index + limit
+        return Page(list(results[index:end]), number, paginator)
+
+    seek = _seek_filter(results, cursor["d"], cursor["k"])
+    if cursor["d"] == CURSOR_NEXT:
+        documents = list(results.filter(seek)[:limit])
+    else:
+        documents = list(results.filter(seek).reverse()[:limit])
+        documents.reverse()
+    return Page(documents, number, paginator)
+
+
+def _page_cursors(
+    results, page: Page, limit: int
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    Returns the cursors for the pages after and before the given page.
+    """
+    documents = list(page.object_list)
+    if not documents:
+        return None, None
+
+    start = (page.number - 1) * limit
+    end = start + len(documents)
+    seekable = isinstance(results, QuerySet)
+
+    # An estimated count may be short of the real one, so with an estimate
+    # a full page is assumed to have another page after it
+    count = page.paginator.count
+    if page.paginator.is_estimate:
+        has_next = len(documents) == limit
+    else:
+        has_next = end < count
+
+    next_cursor = None
+    if has_next:
+        keys = _cursor_keys(results, documents[-1]) if seekable else []
+        next_cursor = encode_cursor(CURSOR_NEXT, keys, end)
+
+    prev_cursor = None
+    if start > 0:
+        keys = _cursor_keys(results, documents[0]) if seekable else []
+        prev_cursor = encode_cursor(CURSOR_PREV, keys, max(start - limit, 0))
+
+    return next_cursor, prev_cursor
+
 
 def paginate(
-    context: dict, config: SearchDocumentConfig, results: QuerySet
+    context: dict,
+    config: SearchDocumentConfig,
+    results: QuerySet,
+    matches: Optional[QuerySet] = None,
 ) -> dict:
     """
     Paginates the given query set and updates the context with
@@ -24,6 +310,9 @@ def paginate(
     - config (SearchDocumentConfig):
         Configuration object containing limit and offset for pagination.
     - results (QuerySet): The query set of documents to be paginated.
+    - matches (Optional[QuerySet]):
+        Every document matching a relevance ranked search, counted for the
+        total when only the top SEARCH_RELEVANCE_CANDIDATES were ranked.
 
     Returns:
     - dict:
@@ -32,13 +321,21 @@ def paginate(
 
     Logs the time taken for the pagination process in different stages:
     1. Time taken to paginate the documents.
-    2. Time taken to process regulatory topics for each document.
-    3. Time taken to update the context with pagination details.
+    2. Time taken to update the context with pagination details.
+
+    Display fields (type label, formatted dates and regulatory topics) are
+    stored on each document at ingest time, so no parsing is done here, and
+    only those columns are read, into SearchResult records.
 
     Handles pagination exceptions:
     - If the page is not an integer, defaults to the first page.
     - If the page is empty, defaults to the last page.
 
+    When the configuration has a cursor (from a previous page's
+    next_cursor or prev_cursor) the page is read by seeking on the sort keys
+    instead of using an OFFSET, which keeps deep pages cheap. An invalid
+    cursor falls back to the offset.
+
     Converts the paginated documents into a list of JSON objects with keys:
     - "id"
     - "title"
@@ -54,89 +351,61 @@ def paginate(
     - Paginated documents in JSON format.
     - Total number of results in the current page.
     - Boolean to indicate if pagination is needed.
-    - Total number of results.
+    - Total number of results, and whether it is an estimate.
+    - Whether relevance ranking was capped to the top candidates, in which
+      case the total is every match but only the ranked ones are paginated.
     - Total number of pages.
     - Current page number.
     - Start index of the results in the current page.
     - End index of the results in the current page.
+    - Cursors for the next and previous pages, or None.
     """
     start_time = time.time()
 
     logger.debug("paginating documents...")
-    paginator = Paginator(results, config.limit)
-    try:
-        paginated_documents = paginator.page(config.offset)
-    except PageNotAnInteger:
-        paginated_documents = paginator.page(1)
-    except EmptyPage:
-        paginated_documents = paginator.page(paginator.num_pages)
+    results = project_results(results)
+    paginator = SearchPaginator(results, config.limit, config)
+    cursor = decode_cursor(config.cursor) if config.cursor else None
+    if cursor is not None:
+        paginated_documents = _page_from_cursor(
+            paginator, results, config.limit, cursor
+        )
+        config.offset = paginated_documents.number
+    else:
+        try:
+            paginated_documents = paginator.page(config.offset)
+        except PageNotAnInteger:
+            paginated_documents = paginator.page(1)
+        except EmptyPage:
+            paginated_documents = paginator.page(paginator.num_pages)
+
+    # Only the displayed columns are read, into lightweight result records
+    paginated_documents.object_list = [
+        SearchResult(row) for row in paginated_documents.object_list
+    ]
+
+    next_cursor, prev_cursor = _page_cursors(
+        results, paginated_documents, config.limit
+    )
 
     end_time = time.time()
     logger.debug(
-        f"time taken to paginate (before description +/ regulatory topics):"
-        f" {round(end_time - start_time, 2)} seconds"
+        f"time taken to paginate: {round(end_time - start_time, 2)} seconds"
     )
 
-    # Iterate over each document in paginated_documents
-    if paginated_documents:
-        start_time = time.time()
-
-        for paginated_document in paginated_documents:
-            if hasattr(paginated_document, "regulatory_topics"):
-                regulatory_topics = paginated_document.regulatory_topics
-                if regulatory_topics:
-                    paginated_document.regulatory_topics = str(
-                        regulatory_topics
-                    ).split("\n")
-
-        end_time = time.time()
-        logger.debug(
-            f"time taken to paginate "
-            f"(after description +/ regulatory topics): "
-            f"{round(end_time - start_time, 2)} seconds"
-        )
-
     # Convert paginated_documents into a list of json objects
-    paginated_documents_json = []
-
-    legislation_types, non_legislation_types = document_type_groups()
-    for paginated_document in paginated_documents:
-        ptype = paginated_document.type
-        label_type = ""
-
-        # First check in legislation_types
-        for item in legislation_types:
-            if item.get("name") == ptype:
-                label_type = item.get("label")
-                break
-
-        # If not found in legislation_types, check in non_legislation_types
-        if not label_type:
-            for item in non_legislation_types:
-                if item.get("name") == ptype:
-                    label_type = item.get("label")
-                    break
-
-        # If still not found, use the original type
-        if not label_type:
-            label_type = ptype
-
-        paginated_documents_json.append(
-            {
-                "id": paginated_document.id,
-                "title": paginated_document.title,
-                "publisher": paginated_document.publisher,
-                "description": paginated_document.description,
-                "type": label_type,
-                "source_date_modified": format_partial_date_govuk(
-                    paginated_document.source_date_modified
-                ),
-                "source_date_issued": format_partial_date_govuk(
-                    paginated_document.source_date_issued
-                ),
-                "regulatory_topics": paginated_document.regulatory_topics,
-            }
-        )
+    paginated_documents_json = [
+        paginated_document.to_json()
+        for paginated_document in paginated_documents
+    ]
+
+    total_count = paginator.count
+    is_estimate = paginator.is_estimate
+    capped = False
+    if matches is not None and _may_be_capped(results, paginator):
+        total_count, is_estimate = _match_count(config, matches)
+        total_count = max(total_count, paginator.count)
+        capped = total_count > paginator.count
 
     start_time = time.time()
     context["paginator"] = paginator
@@ -144,11 +413,15 @@ def paginate(
     context["results"] = paginated_documents_json
     context["results_count"] = len(paginated_documents)
     context["is_paginated"] = paginator.num_pages > 1
-    context["results_total_count"] = paginator.count
+    context["results_total_count"] = total_count
+    context["is_estimate"] = is_estimate
+    context["results_capped"] = capped
     context["results_page_total"] = paginator.num_pages
     context["current_page"] = config.offset
     context["start_index"] = paginated_documents.start_index()
     context["end_index"] = paginated_documents.end_index()
+    context["next_cursor"] = next_cursor
+    context["prev_cursor"] = prev_cursor
     end_time = time.time()
 
     logger.debug(
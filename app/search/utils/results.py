@@ -0,0 +1,87 @@
+from app.search.utils.documents import get_document_type_label
+
+# Columns read for a page of search results, sort_date is needed for cursor
+# pagination
+RESULT_FIELDS = (
+    "id",
+    "title",
+    "publisher",
+    "description",
+    "type",
+    "type_label",
+    "display_date_modified",
+    "display_date_issued",
+    "regulatory_topics_list",
+    "sort_date",
+)
+
+# Relevance ranking annotations, read when present for cursor pagination
+RANKING_FIELDS = ("has_title_match", "final_score")
+
+
+def project_results(results):
+    """
+    Restricts search results to the columns displayed in the results page.
+
+    Args:
+        results (QuerySet | BM25SearchResults): The ordered search results.
+
+    Returns:
+        The same results, yielding dicts of RESULT_FIELDS (plus the
+        relevance ranking annotations, when ranked) instead of model
+        instances.
+    """
+    fields = RESULT_FIELDS
+    query = getattr(results, "query", None)
+    if query is not None and "final_score" in query.annotations:
+        fields += RANKING_FIELDS
+    return results.values(*fields)
+
+
+class SearchResult:
+    """
+    A single search result with only the fields shown in the results page.
+
+    Built from a project_results row and shared by the Django and DRF search
+    views, instead of a full DataResponseModel instance.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "publisher",
+        "description",
+        "type",
+        "source_date_modified",
+        "source_date_issued",
+        "regulatory_topics",
+        "sort_date",
+        "has_title_match",
+        "final_score",
+    )
+
+    def __init__(self, row: dict):
+        self.id = row["id"]
+        self.title = row["title"]
+        self.publisher = row["publisher"]
+        self.description = row["description"]
+        # The display label is stored at ingest time
+        self.type = row["type_label"] or get_document_type_label(row["type"])
+        self.source_date_modified = row["display_date_modified"]
+        self.source_date_issued = row["display_date_issued"]
+        self.regulatory_topics = row["regulatory_topics_list"]
+        self.sort_date = row["sort_date"]
+        self.has_title_match = row.get("has_title_match")
+        self.final_score = row.get("final_score")
+
+    def to_json(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "publisher": self.publisher,
+            "description": self.description,
+            "type": self.type,
+            "source_date_modified": self.source_date_modified,
+            "source_date_issued": self.source_date_issued,
+            "regulatory_topics": self.regulatory_topics,
+        }
@@ -1,11 +1,20 @@
+import hashlib
+import json
 import logging
+import re
 
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 import requests  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+
+# Characters kept from the end of the text searched for an array's key, so
+# a key split across chunks is still found
+KEY_SEARCH_OVERLAP = 1024
+
 
 def get_data_from_url(
     config, url, type: str = "public", params: Optional[dict] = None
@@ -56,3 +65,151 @@ def get_data_from_url(
 
         logger.error(message)
         return None
+
+
+def fetch_to_file(
+    config,
+    url,
+    path,
+    type: str = "public",
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    chunk_size: int = 64 * 1024,
+):
+    """
+    Fetch data from a given URL into a file, streaming the response body to
+    disk and hashing it as it is written, so it is never held in memory as
+    a whole.
+
+    Parameters:
+    - config: Configuration object that includes the request timeout.
+    - url: String representing the URL to request.
+    - path: The file the response body is written to.
+    - headers: Request headers, e.g. If-None-Match for a conditional
+        request.
+    - chunk_size: Number of bytes read from the response at a time.
+
+    Returns:
+    - The status code, response headers and sha256 hash of the body if the
+        status code is 200.
+    - The status code, response headers and None if the status code is 304
+        (not modified), the file is not written.
+    - None if the response status code is anything else, or if there is an
+        exception during the request.
+
+    Logs:
+    - Error messages for request failures and non-200 response codes.
+    """
+    try:
+        with requests.get(
+            url,
+            timeout=config.timeout,
+            stream=True,
+            headers=headers or {},
+            **({"params": params} if params else {}),
+        ) as response:  # nosec BXXX
+            if response.status_code == 304:
+                return response.status_code, response.headers, None
+
+            if response.status_code == 200:
+                digest = hashlib.sha256()
+                with open(path, "wb") as file:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        digest.update(chunk)
+                        file.write(chunk)
+                return (
+                    response.status_code,
+                    response.headers,
+                    (digest.hexdigest()),
+                )
+
+            # If the status code is not 200, log the error
+            logger.error(
+                f"error fetching data {type} from {url}: "
+                f"[{response.status_code}]: {response.reason}"
+            )
+            return None
+    except (
+        requests.exceptions.Timeout,
+        requests.exceptions.RequestException,
+    ) as e:
+        if isinstance(e, requests.exceptions.Timeout):
+            message = (
+                f"timeout [{config.timeout} second(s)] "
+                f"fetching {type} data: {url}"
+            )
+        else:
+            message = f"exception raised fetching {type} data: {url}: {e}"
+
+        logger.error(message)
+        return None
+
+
+def iter_json_array(chunks: Iterable[str], key: str) -> Iterator:
+    """
+    Incrementally decodes the items of the array under a key of a JSON
+    object, from a stream of JSON text.
+
+    Items are decoded one at a time with json.JSONDecoder.raw_decode as
+    their text arrives, so only the item being decoded and the unread part
+    of the current chunk are held in memory, however long the array is.
+
+    The first occurrence of the key followed by an array is used, so the
+    key shouldn't appear earlier in the document, e.g. in another key's
+    value.
+
+    Args:
+        chunks (Iterable[str]): The JSON text.
+        key (str): The key of the array.
+
+    Yields:
+        The decoded items of the array.
+
+    Raises:
+        ValueError: If the array is malformed or the text ends before the
+            array does.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    array_start_re = re.compile(r"%s\s*:\s*\[" % re.escape(json.dumps(key)))
+
+    # Find the start of the array
+    buffer = ""
+    while True:
+        match = array_start_re.search(buffer)
+        if match:
+            break
+        chunk = next(chunks, None)
+        if chunk is None:
+            logger.error(f"array {key} not found in JSON data")
+            return
+        buffer = buffer[-KEY_SEARCH_OVERLAP:] + chunk
+
+    position = match.end()
+    while True:
+        position = _WHITESPACE_RE.match(buffer, position).end()
+        if position < len(buffer):
+            character = buffer[position]
+            if character == "]":
+                return
+            if character == ",":
+                position += 1
+                continue
+
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # A number at the end of the text may continue in the next
+                # chunk
+                if end < len(buffer) or isinstance(item, (dict, list, str)):
+                    yield item
+                    position = end
+                    continue
+            except json.JSONDecodeError:
+                pass
+
+        # The next item is incomplete, read more text
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise ValueError(f"JSON data ended inside array {key}")
+        buffer = buffer[position:] + chunk
+        position = 0
@@ -4,20 +4,38 @@
 import logging
 import re
 import time
-from typing import Tuple, Union
-
-from django.contrib.postgres.search import (
-    SearchQuery,
-    SearchVector,
-)  # noqa
-from django.db.models import F, Func, Q, QuerySet
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple, Union
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery  # noqa
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    Min,
+    Q,
+    QuerySet,
+    Value,
+    When,
+    Window,
+)
 from django.http import HttpRequest
 
 from app.search.config import SearchDocumentConfig
-from app.search.models import DataResponseModel
+from app.search.models import DataResponseModel, Publisher
+from app.search.utils.cache import (
+    cached_per_generation,
+    get_cached_search,
+    set_cached_search,
+)
 from app.search.utils.calculate_score import calculate_score
-from app.search.utils.documents import document_type_groups
+from app.search.utils.documents import (
+    normalise_document_type,
+    normalise_publisher_id,
+)
 from app.search.utils.paginate import paginate
+from app.search.utils.spelling import suggest_query
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +123,22 @@ def create_search_query(
             None if not ext_search_results else (None, 0, 0, 0)
         )  # Return None for empty or invalid input
 
+    query, num_ands, num_ors, num_phrases = _build_search_query(tokens)
+
+    if ext_search_results:
+        return query, num_ands, num_ors, num_phrases
+
+    return query
+
+
+def _build_search_query(tokens) -> Tuple[SearchQuery, int, int, int]:
+    """
+    Combine parsed tokens into a single SearchQuery.
+
+    :param tokens: The tokens returned by clean_up_tokens
+    :return: A tuple with the combined query and the number of AND
+             operators, OR operators and phrases
+    """
     # Initialize variables
     query = None
     current_operator = "|"  # Default to implicit OR for space-separated words
@@ -144,13 +178,80 @@ def create_search_query(
             # Reset the operator to implicit OR for the next token
             current_operator = "|"
 
-    if ext_search_results:
-        return query, num_ands, num_ors, num_phrases
+    return query, num_ands, num_ors, num_phrases
 
-    return query
 
+def _count_operators(tokens) -> Tuple[int, int, int]:
+    """
+    Count the operators and phrases in parsed tokens.
+
+    :param tokens: The tokens returned by clean_up_tokens
+    :return: A tuple with the number of AND operators, OR operators and
+             phrases
+    """
+    num_ands = 0
+    num_ors = 0
+    num_phrases = 0
+    for token in tokens:
+        if token.upper() == "AND":
+            num_ands += 1
+        elif token.upper() == "OR":
+            num_ors += 1
+        elif token.startswith('"') and token.endswith('"'):
+            num_phrases += 1
+    return num_ands, num_ors, num_phrases
+
+
+class CompiledSearchQuery(NamedTuple):
+    """
+    The parsed form of a sanitised search string.
+
+    Attributes:
+        tokens: The plain tokens followed by the all-phrases tokens.
+        query: The combined SearchQuery, or None for an empty query.
+        num_ands: The number of AND operators typed by the user.
+        num_ors: The number of OR operators typed by the user.
+        num_phrases: The number of phrases typed by the user.
+    """
+
+    tokens: Tuple[str, ...]
+    query: Optional[SearchQuery]
+    num_ands: int
+    num_ors: int
+    num_phrases: int
+
+
+@lru_cache(maxsize=settings.SEARCH_QUERY_CACHE_SIZE)
+def compile_search_query(search_string: str) -> CompiledSearchQuery:
+    """
+    Tokenise and build the search query for a sanitised search string,
+    memoised in a bounded LRU cache keyed on the search string.
+
+    The query is equivalent to create_search_query(search_string, True,
+    True) but the string is only tokenised once per cache miss. The
+    operators and phrases are counted in the user's own tokens only, as
+    the all-phrases copy always adds at least one phrase. Hit and miss
+    statistics are available from compile_search_query.cache_info().
+
+    :param search_string: The sanitised search string
+    :return: A CompiledSearchQuery
+    """
+    user_tokens = tuple(clean_up_tokens(search_string, False))
+    tokens = user_tokens + tuple(clean_up_tokens(search_string, True))
+
+    if not tokens:
+        return CompiledSearchQuery(tokens, None, 0, 0, 0)
+
+    query, _, _, _ = _build_search_query(tokens)
+    return CompiledSearchQuery(tokens, query, *_count_operators(user_tokens))
 
-def search_database(config: SearchDocumentConfig):
+
+def search_database(
+    config: SearchDocumentConfig,
+    capped: bool = True,
+    ranked: bool = True,
+    tiered: bool = True,
+):
     """
     Search for documents based on various criteria including ID, query string,
     document type, publisher, and sort preferences. Implements both strict
@@ -160,10 +261,23 @@ def search_database(config: SearchDocumentConfig):
         config (SearchDocumentConfig): An object containing search configuration
             data such as query string, ID, document types, publishers, and sorting
             preferences.
+        capped (bool, optional): Rank only the top SEARCH_RELEVANCE_CANDIDATES
+            matches of a relevance sorted search. False ranks every match, for
+            unpaginated results such as exports. Defaults to True.
+        ranked (bool, optional): Rank a relevance sorted search. False
+            returns the matching documents sorted by most recent, to count
+            every match of a capped search. Defaults to True.
+        tiered (bool, optional): Keep only the best match tier, partial
+            matches are only returned when there are no strict matches. False
+            keeps both tiers, annotated with their 'match_tier', for callers
+            that pick the tier per group of documents such as facet counts.
+            Defaults to True.
 
     Returns:
         QuerySet: A Django QuerySet containing the filtered and optionally sorted
-        search results.
+        search results. When SEARCH_BACKEND is "bm25" a BM25SearchResults
+        sequence, which can be paginated and iterated in the same way, is
+        returned instead.
     """
     # If an ID is provided, return the document with that ID
     if config.id:
@@ -180,117 +294,148 @@ def search_database(config: SearchDocumentConfig):
 
     # Generate query object
     try:
-        query_objs, num_ands, num_ors, num_phrases = create_search_query(
-            query_str, True, True
-        )
+        compiled_query = compile_search_query(query_str)
+        query_objs = compiled_query.query
+        num_ands = compiled_query.num_ands
+        num_ors = compiled_query.num_ors
+        num_phrases = compiled_query.num_phrases
         logger.debug(f"search query objects: {query_objs}")
+        logger.debug(
+            f"compiled search query cache: "
+            f"{compile_search_query.cache_info()}"
+        )
     except Exception as e:
         logger.error(f"error creating search query: {e}")
+        compiled_query = CompiledSearchQuery((), None, 0, 0, 0)
         query_objs = None
         num_ands = 0
         num_ors = 0
         num_phrases = 0
 
-    # Search across specific fields
-    vector = SearchVector("title", "description", "regulatory_topics")
+    # Answer the search from the in-process index, if enabled
+    if settings.SEARCH_BACKEND == "bm25":
+        from app.search.utils.bm25 import bm25_search
+
+        try:
+            return bm25_search(config, compiled_query)
+        except Exception as e:
+            logger.error(f"error searching BM25 index: {e}")
 
     # Get all documents from the queryset
     queryset = DataResponseModel.objects.all()
-    queryset = queryset.annotate(search=vector)
 
-    # Use the parsed query objects for strict filtering
-    if query_objs:
-        queryset = queryset.annotate(search=vector).filter(
-            Q(search=query_objs)
+    # Filter by document types, each value is either a document type group
+    # (legislation, guidance or standard) or an exact document type. Both
+    # are indexed, normalised columns populated at ingest time
+    if config.document_types:
+        document_types = [
+            normalise_document_type(doc_type)
+            for doc_type in config.document_types
+        ]
+        queryset = queryset.filter(
+            Q(type_group__in=document_types) | Q(type_key__in=document_types)
         )
-    else:
-        queryset = queryset.annotate(search=vector)
 
-    # Add partial matches for fallback, if desired
+    # Filter by publisher, normalised as publisher IDs are at ingest time
+    if config.publisher_names:
+        publisher_ids = [
+            normalise_publisher_id(publisher)
+            for publisher in config.publisher_names
+        ]
+        queryset = queryset.filter(publisher_id__in=publisher_ids)
+
+    # Use the parsed query objects for strict filtering against the stored,
+    # GIN indexed search vector (title, description and regulatory topics)
+    strict_matches = Q(search_vector=query_objs) if query_objs else None
+
+    # Add partial matches for fallback, if desired. The 'trigram_contains'
+    # lookup renders as ILIKE so the pg_trgm GIN indexes can be used. A
+    # query with a word missing from the corpus that has a spelling
+    # correction is answered with the correction instead (suggested when
+    # there are no results), rather than substring matches of the misspelling
     if (
         query_str
-        and queryset.count()
         and num_ands == 0
         and num_ors == 0
         and num_phrases == 0
+        and suggest_query(query_str) is None
     ):
-        logger.debug(
-            "adding partial matches to search query as "
-            "query string brought no results for strict search"
-        )
-        queryset = DataResponseModel.objects.all()
         query_chunks = query_str.split()
         partial_matches = Q()
         for chunk in query_chunks:
             partial_matches |= (
-                Q(title__icontains=chunk)
-                | Q(description__icontains=chunk)
-                | Q(regulatory_topics__icontains=chunk)
+                Q(title__trigram_contains=chunk)
+                | Q(description__trigram_contains=chunk)
+                | Q(regulatory_topics__trigram_contains=chunk)
             )
-        queryset = queryset.filter(partial_matches)
-        logger.debug("queryset values after partial matches: %s", queryset)
 
-    # Filter by document types
-    if config.document_types:
-        query = Q()
-        for doc_type in config.document_types:
-            query |= Q(type__icontains=doc_type)
-        queryset = queryset.filter(query)
-
-    # Filter by publisher
-    if config.publisher_names:
-        query = Q()
-        for publisher in config.publisher_names:
-            query |= Q(publisher_id__icontains=publisher)
-        queryset = queryset.filter(query)
-
-    # Sort results based on the sort_by parameter
-    if config.sort_by is None or config.sort_by == "recent":
-        return queryset.order_by(F("sort_date").desc(nulls_last=True))
-
-    if config.sort_by == "relevance":
+        if strict_matches is None:
+            queryset = queryset.filter(partial_matches)
+        else:
+            # Fold the strict match and partial match fallback into a single
+            # query rather than counting the strict matches first. Each row
+            # is tagged with its match tier (0 = strict, 1 = partial) and
+            # only rows in the best tier present are kept, so partial
+            # matches are only returned when there are no strict matches.
+            # The tiered selection is kept in a subquery so that later
+            # filters (e.g. cursor pagination) do not change the best tier.
+            logger.debug("adding partial matches to search query as fallback")
+            queryset = queryset.filter(
+                strict_matches | partial_matches
+            ).annotate(
+                match_tier=Case(
+                    When(strict_matches, then=Value(0)),
+                    default=Value(1),
+                    output_field=IntegerField(),
+                )
+            )
+            if tiered:
+                best_tier_matches = queryset.annotate(
+                    best_match_tier=Window(expression=Min("match_tier"))
+                ).filter(match_tier=F("best_match_tier"))
+                queryset = DataResponseModel.objects.filter(
+                    pk__in=best_tier_matches.values("pk")
+                )
+    elif strict_matches is not None:
+        queryset = queryset.filter(strict_matches)
+
+    # Sort results based on the sort_by parameter, relevance needs a query
+    # to rank against. The id breaks ties so the order is stable for cursor
+    # pagination
+    if ranked and config.sort_by == "relevance" and query_objs:
+        candidates = None
+        if capped and settings.SEARCH_RELEVANCE_CANDIDATES:
+            candidates = settings.SEARCH_RELEVANCE_CANDIDATES
         try:
             # Calculate the score for each document based on the search query
-            queryset = calculate_score(query_objs, queryset)
+            return calculate_score(query_objs, queryset, candidates=candidates)
         except Exception as e:
             logger.error(f"error calculating score for search: {e}")
 
-    return queryset
+    return queryset.order_by(F("sort_date").desc(nulls_last=True), "id")
 
 
-def search(
-    context: dict, request: HttpRequest, ignore_pagination=False
-) -> dict | QuerySet[DataResponseModel]:
-    logger.debug("received search request: %s", request)
-    logger.debug("received search context: %s", context)
-    logger.debug("ignore_pagination: %s", ignore_pagination)
-    start_time = time.time()
+def get_search_config(request: HttpRequest) -> SearchDocumentConfig:
+    """
+    Builds a sanitised search configuration from the request's query
+    parameters.
 
+    Args:
+        request (HttpRequest): A search request.
+
+    Returns:
+        SearchDocumentConfig: The sanitised search configuration.
+    """
     search_query = request.GET.get("query", request.GET.get("search", ""))
     document_types = request.GET.getlist("document_type", [])
 
-    if "legislation" in document_types:
-        legislation, _ = document_type_groups()
-        # Create a set from document_types for O(1) lookups
-        existing_types = set(document_types)
-
-        # Filter and extend in one operation instead of checking and appending one by one
-        new_types = [
-            item.get("name")
-            for item in legislation
-            if item.get("name") is not None
-            and item.get("name") not in existing_types
-        ]
-
-        # Add all new types at once
-        document_types.extend(new_types)
-
     offset = request.GET.get("page", "1")
     offset = int(offset) if offset.isdigit() else 1
     limit = request.GET.get("limit", "10")
     limit = int(limit) if limit.isdigit() else 10
     publishers = request.GET.getlist("publisher", [])
     sort_by = request.GET.get("sort", None)
+    cursor = request.GET.get("cursor", None)
 
     # Get the search results from the Data API using PublicGateway class
     config = SearchDocumentConfig(
@@ -300,15 +445,34 @@ def search(
         offset=offset,
         publisher_names=publishers,
         sort_by=sort_by,
+        cursor=cursor,
     )
 
     config.sanitize_all_if_needed()
+    return config
+
+
+def search(
+    context: dict, request: HttpRequest, ignore_pagination=False
+) -> dict | QuerySet[DataResponseModel]:
+    logger.debug("received search request: %s", request)
+    logger.debug("received search context: %s", context)
+    logger.debug("ignore_pagination: %s", ignore_pagination)
+    start_time = time.time()
+
+    config = get_search_config(request)
 
     # Display the search query in the log
     config.print_to_log("search")
 
-    # Search across specific fields
-    results = search_database(config)
+    # Serve a repeat search for the current dataset from the cache
+    if not ignore_pagination:
+        cached_context = get_cached_search(context, config)
+        if cached_context is not None:
+            return cached_context
+
+    # Search across specific fields, unpaginated results rank every match
+    results = search_database(config, capped=not ignore_pagination)
     logger.debug("search results from database: %s", results)
 
     if ignore_pagination:
@@ -318,7 +482,20 @@ def search(
     # convert search_results into json
     logger.debug("building context for search results-pagination...")
     pag_start_time = time.time()
-    context = paginate(context, config, results)
+    # Every match of a relevance search is counted for the total, as only
+    # the top candidates are ranked
+    matches = None
+    if config.sort_by == "relevance" and isinstance(results, QuerySet):
+        matches = search_database(config, ranked=False)
+    context = paginate(context, config, results, matches)
+
+    # Suggest a spelling correction from the corpus lexicon when nothing
+    # matches
+    context["suggested_query"] = None
+    if context["results_total_count"] == 0:
+        context["suggested_query"] = suggest_query(config.search_query)
+
+    set_cached_search(context, config)
     pag_end_time = time.time()
 
     logger.debug(
@@ -336,27 +513,29 @@ def search(
     return context
 
 
-class Trim(Func):
-    function = "TRIM"
-    template = "%(function)s(%(expressions)s)"
+@cached_per_generation
+def _publisher_catalogue():
+    return list(
+        Publisher.objects.order_by("name").values(
+            trimmed_publisher=F("name"),
+            trimmed_publisher_id=F("publisher_id"),
+        )
+    )
 
 
 def get_publisher_names():
+    """
+    Returns the publishers from the Publisher catalogue, as dicts with
+    "trimmed_publisher" and "trimmed_publisher_id" keys.
+
+    The catalogue is rebuilt at ingest and held in the process until the
+    dataset generation changes.
+    """
     logger.debug("getting publisher names...")
     publishers_list = []
 
     try:
-        publishers_list = (
-            DataResponseModel.objects.annotate(
-                trimmed_publisher=Trim(F("publisher")),
-                trimmed_publisher_id=Trim(F("publisher_id")),
-            )
-            .values(
-                "trimmed_publisher",
-                "trimmed_publisher_id",
-            )
-            .distinct()
-        )
+        publishers_list = _publisher_catalogue()
     except Exception as e:
         logger.error(f"error getting publisher names: {e}")
         logger.debug("returning empty list of publishers")
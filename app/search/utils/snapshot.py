@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import time
+
+from pathlib import Path
+from typing import Iterator
+
+from app.search.utils.retrieve_data import fetch_to_file
+
+logger = logging.getLogger(__name__)
+
+
+class GatewaySnapshot:
+    """
+    The raw public gateway payload kept on disk, with the HTTP validators
+    (ETag and Last-Modified) and content hash of the download and the hash
+    of the payload last ingested.
+
+    The validators make the nightly fetch a conditional request, and the
+    hashes let a rebuild be skipped when the payload hasn't changed. The
+    payload can also be ingested again without fetching it (an offline
+    rebuild).
+    """
+
+    def __init__(self, directory, name: str = "uk-business-regulations"):
+        self.directory = Path(directory)
+        self.data_path = self.directory / f"{name}.json"
+        self.metadata_path = self.directory / f"{name}.metadata.json"
+        self.download_path = self.directory / f"{name}.json.download"
+
+    def exists(self) -> bool:
+        return self.data_path.exists()
+
+    def read_metadata(self) -> dict:
+        """
+        Returns the snapshot's metadata, or an empty dict if there is no
+        snapshot.
+        """
+        if not self.exists():
+            return {}
+        try:
+            with open(self.metadata_path) as file:
+                return json.load(file)
+        except Exception as e:
+            logger.error(f"error reading snapshot metadata: {e}")
+            return {}
+
+    def write_metadata(self, metadata: dict):
+        """
+        Replaces the snapshot's metadata.
+        """
+        temporary_path = self.metadata_path.with_suffix(".tmp")
+        with open(temporary_path, "w") as file:
+            json.dump(metadata, file)
+        os.replace(temporary_path, self.metadata_path)
+
+    def conditional_headers(self) -> dict:
+        """
+        Returns the request headers that make a fetch conditional on the
+        payload having changed since the snapshot was taken.
+        """
+        metadata = self.read_metadata()
+        headers = {}
+        if metadata.get("etag"):
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            headers["If-Modified-Since"] = metadata["last_modified"]
+        return headers
+
+    def fetch(self, config, url, params=None, chunk_size=64 * 1024):
+        """
+        Fetches the payload with a conditional request, replacing the
+        snapshot if the payload has changed.
+
+        The payload is downloaded next to the snapshot and moved over it
+        once complete, so a failed download leaves the snapshot as it was.
+
+        Args:
+            config: Configuration object that includes the request timeout.
+            url (str): The public gateway URL.
+            params (dict, optional): The request's query parameters.
+            chunk_size (int, optional): Number of bytes read at a time.
+
+        Returns:
+            Optional[int]: The response status code, 200 or 304 (not
+                modified), or None if the fetch failed.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        metadata = self.read_metadata()
+
+        result = fetch_to_file(
+            config,
+            url,
+            self.download_path,
+            "public",
+            params,
+            headers=self.conditional_headers(),
+            chunk_size=chunk_size,
+        )
+        if result is None:
+            self.download_path.unlink(missing_ok=True)
+            return None
+
+        status_code, headers, content_hash = result
+        if status_code == 304:
+            logger.info("public gateway data not modified since snapshot")
+            return status_code
+
+        if content_hash == metadata.get("content_hash"):
+            logger.info("public gateway data identical to snapshot")
+            self.download_path.unlink()
+        else:
+            os.replace(self.download_path, self.data_path)
+
+        metadata.update(
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            content_hash=content_hash,
+            fetched_at=time.time(),
+        )
+        self.write_metadata(metadata)
+        return status_code
+
+    def needs_ingest(self) -> bool:
+        """
+        Whether the snapshot differs from the payload last ingested
+        successfully.
+        """
+        metadata = self.read_metadata()
+        return bool(metadata.get("content_hash")) and (
+            metadata.get("content_hash") != metadata.get("ingested_hash")
+        )
+
+    def mark_ingested(self):
+        """
+        Records the snapshot as ingested, after a successful rebuild.
+        """
+        metadata = self.read_metadata()
+        metadata["ingested_hash"] = metadata.get("content_hash")
+        self.write_metadata(metadata)
+
+    def iter_text(self, chunk_size: int = 64 * 1024) -> Iterator[str]:
+        """
+        Reads the snapshot's payload chunk by chunk.
+
+        Yields:
+            str: The payload's text.
+        """
+        with open(self.data_path, encoding="utf-8") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
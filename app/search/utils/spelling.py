@@ -0,0 +1,236 @@
+import logging
+import re
+import time
+
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+from app.search.models import DataResponseModel
+from app.search.utils.bm25 import STOP_WORDS, tokenize
+from app.search.utils.cache import cached_per_generation
+
+logger = logging.getLogger(__name__)
+
+# Only the first PREFIX_LENGTH characters of a term are indexed by their
+# deletes, which bounds the size of the index for long terms
+PREFIX_LENGTH = 7
+
+# Words shorter than this are never corrected
+MIN_WORD_LENGTH = 3
+
+# Words up to this long are corrected by at most one edit
+SHORT_WORD_LENGTH = 4
+
+_WORD_RE = re.compile(r"\w+")
+
+SEARCH_OPERATORS = frozenset(["AND", "OR"])
+
+
+def _deletes(word: str, max_distance: int) -> set[str]:
+    """
+    Returns the word and every string made by deleting up to max_distance
+    of its characters.
+    """
+    variants = {word}
+    edges = {word}
+    for _ in range(max_distance):
+        edges = {
+            edge[:i] + edge[i + 1 :]  # noqa: E203
+            for edge in edges
+            for i in range(len(edge))
+        } - variants
+        variants |= edges
+    return variants
+
+
+def edit_distance(source: str, target: str) -> int:
+    """
+    Returns the optimal string alignment distance between two strings: the
+    number of insertions, deletions, substitutions and transpositions of
+    adjacent characters needed to turn one into the other.
+    """
+    previous_previous: list[int] = []
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = source[i - 1] != target[j - 1]
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost,
+            )
+            if (
+                i > 1
+                and j > 1
+                and source[i - 1] == target[j - 2]
+                and source[i - 2] == target[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SpellingLexicon:
+    """
+    An immutable symmetric delete spelling index over the corpus terms.
+
+    Every term is indexed under each string made by deleting up to
+    max_distance characters from its prefix. The candidate corrections of
+    a word are the terms indexed under the word's own deletes, so a lookup
+    never has to compare the word against the whole vocabulary.
+    """
+
+    def __init__(self, frequencies: dict[str, int], max_distance: int):
+        """
+        Builds the index.
+
+        Args:
+            frequencies (dict[str, int]): The number of documents each term
+                appears in.
+            max_distance (int): The largest number of edits corrected.
+        """
+        self.frequencies = frequencies
+        self.max_distance = max_distance
+        self.deletes: dict[str, list[str]] = defaultdict(list)
+        for term in frequencies:
+            for variant in _deletes(term[:PREFIX_LENGTH], max_distance):
+                self.deletes[variant].append(term)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.frequencies
+
+    def correct(self, word: str) -> Optional[str]:
+        """
+        Returns the closest term to a word, the most frequent of the closest
+        if there are several.
+
+        Args:
+            word (str): A lower-cased word.
+
+        Returns:
+            Optional[str]: The word itself if it is a term, its correction,
+                or None if no term is close enough.
+        """
+        if word in self.frequencies:
+            return word
+        if len(word) < MIN_WORD_LENGTH:
+            return None
+
+        max_distance = (
+            min(self.max_distance, 1)
+            if len(word) <= SHORT_WORD_LENGTH
+            else self.max_distance
+        )
+
+        best = None
+        checked = set()
+        for variant in _deletes(word[:PREFIX_LENGTH], max_distance):
+            for term in self.deletes.get(variant, ()):
+                if term in checked:
+                    continue
+                checked.add(term)
+                if abs(len(term) - len(word)) > max_distance:
+                    continue
+                distance = edit_distance(word, term)
+                if distance > max_distance:
+                    continue
+                candidate = (distance, -self.frequencies[term], term)
+                if best is None or candidate < best:
+                    best = candidate
+        return best[2] if best else None
+
+    def correct_query(self, search_query: str) -> Optional[str]:
+        """
+        Corrects the misspelled words of a search query, keeping its
+        operators, quotes and stop words.
+
+        Args:
+            search_query (str): The sanitised search query.
+
+        Returns:
+            Optional[str]: The corrected query, or None if no word was
+                corrected.
+        """
+        corrected = False
+
+        def correct_word(match):
+            nonlocal corrected
+            word = match.group(0)
+            lower = word.lower()
+            if (
+                word in SEARCH_OPERATORS
+                or lower in STOP_WORDS
+                or lower.isdigit()
+                or lower in self
+            ):
+                return word
+
+            correction = self.correct(lower)
+            if correction is None:
+                return word
+            corrected = True
+            return correction
+
+        corrected_query = _WORD_RE.sub(correct_word, search_query)
+        return corrected_query if corrected else None
+
+
+def _term_frequencies(documents) -> dict[str, int]:
+    """
+    Counts the documents each title, description and regulatory topic term
+    appears in.
+    """
+    frequencies: Counter = Counter()
+    for document in documents:
+        terms: Iterable[str] = set(
+            tokenize(document["title"])
+            + tokenize(document["description"])
+            + tokenize(document["regulatory_topics"])
+        )
+        frequencies.update(terms)
+    return dict(frequencies)
+
+
+@cached_per_generation
+def get_spelling_lexicon() -> SpellingLexicon:
+    """
+    Returns the spelling lexicon for the current dataset generation,
+    building it from DataResponseModel if needed.
+    """
+    start_time = time.time()
+    documents = DataResponseModel.objects.values(
+        "title", "description", "regulatory_topics"
+    ).iterator(chunk_size=2000)
+    lexicon = SpellingLexicon(
+        _term_frequencies(documents),
+        settings.SEARCH_SPELLING_MAX_EDIT_DISTANCE,
+    )
+    logger.info(
+        f"built spelling lexicon of {len(lexicon.frequencies)} terms in "
+        f"{round(time.time() - start_time, 2)} seconds"
+    )
+    return lexicon
+
+
+def suggest_query(search_query: str) -> Optional[str]:
+    """
+    Suggests a corrected search query for a search with no results.
+
+    Args:
+        search_query (str): The sanitised search query.
+
+    Returns:
+        Optional[str]: The corrected query, or None if there is nothing to
+            correct.
+    """
+    if not search_query:
+        return None
+
+    try:
+        return get_spelling_lexicon().correct_query(search_query)
+    except Exception as e:
+        logger.error(f"error suggesting a corrected search query: {e}")
+        return None
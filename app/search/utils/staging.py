@@ -0,0 +1,155 @@
+import logging
+import re
+import time
+
+from django.db import connection, transaction
+
+from app.search.models import DataResponseModel, StagingDataResponseModel
+
+logger = logging.getLogger(__name__)
+
+LIVE_TABLE = DataResponseModel._meta.db_table
+STAGING_TABLE = StagingDataResponseModel._meta.db_table
+RETIRED_TABLE = f"{LIVE_TABLE}_retired"
+
+# Staging copies of the live indexes are named with this suffix until the
+# swap, as index names are unique per schema
+STAGING_SUFFIX = "_staging"
+
+# Postgres truncates identifiers longer than this
+MAX_IDENTIFIER_LENGTH = 63
+
+_INDEX_DEFINITION_RE = re.compile(
+    r"^(CREATE (?:UNIQUE )?INDEX )(\S+)( ON (?:ONLY )?)(\S+)( .*)$"
+)
+
+
+def _staging_name(name: str) -> str:
+    return name[: MAX_IDENTIFIER_LENGTH - len(STAGING_SUFFIX)] + STAGING_SUFFIX
+
+
+def _live_indexes(cursor) -> list[tuple[str, str, bool]]:
+    """
+    Returns the name and definition of each index of the live table, and
+    whether it is the primary key.
+    """
+    cursor.execute(
+        """
+        SELECT index_class.relname,
+               pg_get_indexdef(pg_index.indexrelid),
+               pg_index.indisprimary
+          FROM pg_index
+          JOIN pg_class index_class
+            ON index_class.oid = pg_index.indexrelid
+         WHERE pg_index.indrelid = %s::regclass
+         ORDER BY index_class.relname
+        """,
+        [LIVE_TABLE],
+    )
+    return cursor.fetchall()
+
+
+def create_staging_table():
+    """
+    Creates an empty staging table with the columns, defaults and primary
+    key of the live DataResponseModel table, replacing any left by an
+    earlier rebuild.
+
+    Only the primary key is created up front: the other indexes are built
+    by swap_staging_table once the documents are loaded, which is quicker
+    than maintaining them row by row.
+    """
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {qn(STAGING_TABLE)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(STAGING_TABLE)} "
+            f"(LIKE {qn(LIVE_TABLE)} INCLUDING ALL EXCLUDING INDEXES)"
+        )
+        for name, _, is_primary in _live_indexes(cursor):
+            if is_primary:
+                cursor.execute(
+                    f"ALTER TABLE {qn(STAGING_TABLE)} "
+                    f"ADD CONSTRAINT {qn(_staging_name(name))} "
+                    f"PRIMARY KEY ({qn(DataResponseModel._meta.pk.column)})"
+                )
+    logger.debug(f"created staging table {STAGING_TABLE}")
+
+
+def copy_live_documents(exclude_ids):
+    """
+    Copies the documents of the live table into the staging table, except
+    those with the given IDs.
+
+    Args:
+        exclude_ids (list[str]): The IDs of the documents not to copy.
+
+    Returns:
+        int: The number of documents copied.
+    """
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(STAGING_TABLE)} "
+            f"SELECT * FROM {qn(LIVE_TABLE)} "
+            f"WHERE NOT ({qn(DataResponseModel._meta.pk.column)} = ANY(%s))",
+            [list(exclude_ids)],
+        )
+        copied = cursor.rowcount
+    logger.debug(f"copied {copied} documents to staging table")
+    return copied
+
+
+def swap_staging_table():
+    """
+    Builds the live table's indexes on the staging table, then swaps the
+    staging table in as the live table.
+
+    The swap renames the tables and indexes in one transaction, so
+    searches see either the previous dataset or the new one, never an
+    empty or partly loaded table, and only wait for the renames.
+    """
+    qn = connection.ops.quote_name
+    start_time = time.time()
+
+    with connection.cursor() as cursor:
+        indexes = _live_indexes(cursor)
+        staged = [name for name, _, is_primary in indexes if is_primary]
+
+        # Build the secondary indexes over the loaded documents
+        for name, definition, is_primary in indexes:
+            if is_primary:
+                continue
+            match = _INDEX_DEFINITION_RE.match(definition)
+            if match is None:
+                logger.error(f"unrecognised index definition: {definition}")
+                continue
+            cursor.execute(
+                f"{match.group(1)}{qn(_staging_name(name))}"
+                f"{match.group(3)}{qn(STAGING_TABLE)}{match.group(5)}"
+            )
+            staged.append(name)
+        cursor.execute(f"ANALYZE {qn(STAGING_TABLE)}")
+        logger.debug(
+            f"built {len(staged)} staging indexes in "
+            f"{round(time.time() - start_time, 2)} seconds"
+        )
+
+        with transaction.atomic():
+            cursor.execute(
+                f"ALTER TABLE {qn(LIVE_TABLE)} RENAME TO {qn(RETIRED_TABLE)}"
+            )
+            cursor.execute(
+                f"ALTER TABLE {qn(STAGING_TABLE)} RENAME TO {qn(LIVE_TABLE)}"
+            )
+            cursor.execute(f"DROP TABLE {qn(RETIRED_TABLE)}")
+            for name in staged:
+                cursor.execute(
+                    f"ALTER INDEX {qn(_staging_name(name))} "
+                    f"RENAME TO {qn(name)}"
+                )
+
+    logger.info(
+        f"swapped in staging table in "
+        f"{round(time.time() - start_time, 2)} seconds"
+    )
@@ -0,0 +1,154 @@
+import heapq
+import logging
+import time
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable, Optional
+
+from app.search.models import DataResponseModel
+from app.search.utils.bm25 import PREFIX_END, tokenize
+from app.search.utils.cache import cached_per_generation
+
+logger = logging.getLogger(__name__)
+
+# Kinds of suggestion
+TITLE_TERM = "term"
+PUBLISHER = "publisher"
+TOPIC = "topic"
+
+
+def normalise_prefix(prefix: Optional[str]) -> str:
+    """
+    Normalises text for prefix matching: lower-cased with whitespace
+    collapsed.
+    """
+    if not prefix:
+        return ""
+    return " ".join(prefix.lower().split())
+
+
+class SuggestIndex:
+    """
+    An immutable prefix index of completions.
+
+    Completions are held in a sorted array of normalised keys with their
+    display text, kind and weight in parallel arrays, so the completions of
+    a prefix are a contiguous range found by binary search.
+    """
+
+    def __init__(self, completions: Iterable[tuple[str, str, int]]):
+        """
+        Builds the index.
+
+        Args:
+            completions (Iterable[tuple[str, str, int]]): The display text,
+                kind and weight (number of documents) of each completion.
+                Completions with the same normalised text and kind are
+                merged, keeping the display text of the heaviest.
+        """
+        merged: dict[tuple[str, str], tuple[int, str]] = {}
+        weights: Counter = Counter()
+        for text, kind, weight in completions:
+            key = (normalise_prefix(text), kind)
+            if not key[0]:
+                continue
+            weights[key] += weight
+            if key not in merged or merged[key][0] < weight:
+                merged[key] = (weight, text.strip())
+
+        ordered = sorted(merged)
+        self.keys = [key for key, _ in ordered]
+        self.kinds = [kind for _, kind in ordered]
+        self.texts = [merged[key][1] for key in ordered]
+        self.weights = [weights[key] for key in ordered]
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def complete(self, prefix: str, limit: int) -> list[dict]:
+        """
+        Returns the heaviest completions of a prefix.
+
+        Args:
+            prefix (str): The text typed so far.
+            limit (int): The maximum number of completions.
+
+        Returns:
+            list[dict]: Up to limit completions, each with "text", "kind"
+                and "count" keys, heaviest first and alphabetically within
+                the same weight.
+        """
+        prefix = normalise_prefix(prefix)
+        if not prefix or limit < 1:
+            return []
+
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + PREFIX_END, start)
+        best = heapq.nlargest(
+            limit, range(start, end), key=self.weights.__getitem__
+        )
+        return [
+            {
+                "text": self.texts[i],
+                "kind": self.kinds[i],
+                "count": self.weights[i],
+            }
+            for i in best
+        ]
+
+
+def _completions(documents) -> Iterable[tuple[str, str, int]]:
+    """
+    Counts the documents for each title term, publisher and regulatory
+    topic.
+    """
+    title_terms: Counter = Counter()
+    publishers: Counter = Counter()
+    topics: Counter = Counter()
+    for document in documents:
+        title_terms.update(set(tokenize(document["title"])))
+        if document["publisher"]:
+            publishers[document["publisher"].strip()] += 1
+        topics.update(set(document["regulatory_topics_list"] or []))
+
+    for term, count in title_terms.items():
+        yield term, TITLE_TERM, count
+    for publisher, count in publishers.items():
+        yield publisher, PUBLISHER, count
+    for topic, count in topics.items():
+        yield topic, TOPIC, count
+
+
+@cached_per_generation
+def get_suggest_index() -> SuggestIndex:
+    """
+    Returns the suggestion index for the current dataset generation,
+    building it from DataResponseModel if needed.
+    """
+    start_time = time.time()
+    documents = DataResponseModel.objects.values(
+        "title", "publisher", "regulatory_topics_list"
+    ).iterator(chunk_size=2000)
+    index = SuggestIndex(_completions(documents))
+    logger.info(
+        f"built suggestion index of {index.size} completions in "
+        f"{round(time.time() - start_time, 2)} seconds"
+    )
+    return index
+
+
+def suggest(prefix: str, limit: int) -> list[dict]:
+    """
+    Returns completions of a prefix from the title terms, publishers and
+    regulatory topics of the documents.
+
+    Args:
+        prefix (str): The text typed so far.
+        limit (int): The maximum number of completions.
+
+    Returns:
+        list[dict]: The completions, heaviest first.
+    """
+    return get_suggest_index().complete(prefix, limit)
@@ -1,8 +1,16 @@
+from functools import lru_cache
+
 import bleach  # type: ignore[import]
 
+from django.conf import settings
+
 
+@lru_cache(maxsize=settings.SEARCH_QUERY_CACHE_SIZE)
 def sanitize_input(search):
     """
     Sanitize user input using a library like bleach.
+
+    Results are memoised in a bounded LRU cache as the same search terms
+    and filter values are sanitised on most requests.
     """
     return bleach.clean(search.strip(), strip=True)
@@ -1,23 +1,43 @@
-import csv
 import http
-import json
 import logging
 
 from django.conf import settings
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_http_methods
 
 from app.core.forms import RegulationSearchForm
 from app.search.config import SearchDocumentConfig
-from app.search.utils.documents import (
-    document_type_groups,
-    validate_related_legislation,
-)
+from app.search.utils.documents import get_document_type_label
+from app.search.utils.export import iter_results, stream_csv
 from app.search.utils.search import search, search_database
 
 logger = logging.getLogger(__name__)
 
+CSV_HEADER = (
+    "title",
+    "publisher",
+    "description",
+    "type",
+    "date_published",
+    "last_updated",
+    "document_url",
+    "external_url",
+)
+
+# Columns read for each CSV row
+CSV_FIELDS = (
+    "title",
+    "publisher",
+    "description",
+    "type",
+    "source_date_issued",
+    "source_date_valid",
+    "source_date_modified",
+    "id",
+    "identifier",
+)
+
 
 @require_http_methods(["GET"])
 def document(request: HttpRequest, id) -> HttpResponse:
@@ -69,67 +89,17 @@ def document(request: HttpRequest, id) -> HttpResponse:
 
         result = queryset.first()
 
-        legislation_types, non_legislation_types = document_type_groups()
-        ptype = result.type
-        label_type = ""
-
-        # First check in legislation_types
-        for item in legislation_types:
-            if item.get("name") == ptype:
-                label_type = item.get("label")
-                break
-
-        # If not found in legislation_types, check in non_legislation_types
-        if not label_type:
-            for item in non_legislation_types:
-                if item.get("name") == ptype:
-                    label_type = item.get("label")
-                    break
-
-        # If still not found, use the original type
-        if not label_type:
-            label_type = ptype
-
-        result.type = label_type
+        # The display label is stored at ingest time
+        result.type = result.type_label or get_document_type_label(result.type)
 
         context["result"] = result
 
-        if context["result"].regulatory_topics is not None:
-            context["result"].regulatory_topics = context[
-                "result"
-            ].regulatory_topics.split("\n")
+        # Regulatory topics and related legislation are parsed and
+        # validated at ingest time
+        result.regulatory_topics = result.regulatory_topics_list
+        result.related_legislation = result.related_legislation_list
 
         context["status_code"] = http.HTTPStatus.OK
-
-        # Parse the related_legislation field
-        related_legislation_str = context["result"].related_legislation
-
-        if related_legislation_str is not None:
-            try:
-                related_legislation_json = json.loads(
-                    related_legislation_str.replace("'", '"')
-                )
-
-                is_valid_related_legislation, err_msg = (
-                    validate_related_legislation(related_legislation_json)
-                )
-
-                if is_valid_related_legislation:
-                    if len(related_legislation_json) > 0:
-                        context["result"].related_legislation = (
-                            related_legislation_json
-                        )
-                    else:
-                        context["result"].related_legislation = None
-                else:
-                    logger.error(
-                        f"related legislation validation error: {err_msg}"
-                    )
-                    context["result"].related_legislation = None
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decoding error: {e}")
-                context["error"] = f"error fetching details: {e}"
-                context["result"].related_legislation = []
     except Exception as e:
         logger.error("error fetching details: %s", e)
         context["error"] = f"error fetching details: {e}"
@@ -187,11 +157,42 @@ def _get_base_url(request: HttpRequest) -> str:
     return base_url
 
 
+def _csv_rows(results, base_url: str):
+    """
+    Yields a CSV row for each search result.
+    """
+    for (
+        title,
+        publisher,
+        description,
+        document_type,
+        source_date_issued,
+        source_date_valid,
+        source_date_modified,
+        id,
+        identifier,
+    ) in iter_results(results, CSV_FIELDS):
+        yield (
+            title,
+            publisher,
+            description,
+            document_type,
+            source_date_issued or source_date_valid,
+            source_date_modified or source_date_issued,
+            f"{base_url}/document/{id}",
+            identifier,
+        )
+
+
 def download_csv(request):
     """
     Download CSV view.
 
     Handles the GET request to download the search results in CSV format.
+
+    The CSV is streamed, reading the results from the database in chunks,
+    so memory use stays flat however many documents match. When nothing
+    matches only the header row is returned.
     """
     logger.debug("building CSV downloadable file")
     context = {
@@ -200,35 +201,16 @@ def download_csv(request):
 
     try:
         logger.debug("searching for all documents")
-        response_data = search(context, request, ignore_pagination=True)
-        logger.debug(f"response_data length: {len(response_data)}")
+        results = search(context, request, ignore_pagination=True)
         base_url = _get_base_url(request)
 
-        search_results = []
-        for result in response_data:
-            search_results.append(
-                {
-                    "title": result.title,
-                    "publisher": result.publisher,
-                    "description": result.description,
-                    "type": result.type,
-                    "date_published": result.source_date_issued
-                    or result.source_date_valid,
-                    "last_updated": result.source_date_modified
-                    or result.source_date_issued,
-                    "document_url": f"{base_url}/document/{result.id}",
-                    "external_url": result.identifier,
-                }
-            )
-
-        response = HttpResponse(content_type="text/csv")
+        response = StreamingHttpResponse(
+            stream_csv(CSV_HEADER, _csv_rows(results, base_url)),
+            content_type="text/csv",
+        )
         response["Content-Disposition"] = (
             'attachment; filename="search_results.csv"'
         )
-
-        writer = csv.DictWriter(response, fieldnames=search_results[0].keys())
-        writer.writeheader()
-        writer.writerows(search_results)
         return response
     except Exception as e:
         logger.error("error downloading CSV: %s", e)
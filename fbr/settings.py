@@ -103,6 +103,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.search.middleware.WarmSearchIndexesMiddleware",
 ]
 
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
@@ -246,16 +247,25 @@ WEBPACK_LOADER = {
 }
 
 
-# TODO: Use redis for cache?
-# CACHES = {
-#     "default": {
-#         "BACKEND": "django_redis.cache.RedisCache",
-#         "LOCATION": f"redis://127.0.0.1:6379/1",
-#         "OPTIONS": {
-#             "CLIENT_CLASS": "django_redis.client.DefaultClient",
-#         },
-#     }
-# }
+# Cache
+# Redis is used when available so that every web process and the celery
+# worker share the cached search results and the dataset generation number.
+# Falls back to a per-process in-memory cache for local development.
+if REDIS_ENDPOINT:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_ENDPOINT,
+            "KEY_PREFIX": "fbr",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "KEY_PREFIX": "fbr",
+        }
+    }
 
 # Logging
 LOGGING: dict[str, Any] = {
@@ -315,6 +325,71 @@ SERVICE_NAME: str = "Find business regulations"
 SERVICE_NAME_LONG: str = "Find business regulations and guidance"
 CONTACT_EMAIL: str = "find-business-regulations@businessandtrade.gov.uk"
 
+# Search
+# Maximum number of sanitised search strings and compiled search queries
+# held in each process's LRU caches
+SEARCH_QUERY_CACHE_SIZE: int = env.int("SEARCH_QUERY_CACHE_SIZE", default=1024)
+# Search backend, "postgres" for Postgres full text search or "bm25" for the
+# in-process BM25 index built from the cached documents
+SEARCH_BACKEND: str = env("SEARCH_BACKEND", default="postgres")
+# Time in seconds a page of search results is held in the cache. Entries are
+# also invalidated whenever the cache rebuild bumps the dataset generation
+SEARCH_RESULTS_CACHE_TIMEOUT: int = env.int(
+    "SEARCH_RESULTS_CACHE_TIMEOUT", default=60 * 60 * 24
+)
+# Maximum number of documents ranked for a relevance sorted search, the
+# top matches by rank are kept and re-ordered title matches first, 0 ranks
+# every match
+SEARCH_RELEVANCE_CANDIDATES: int = env.int(
+    "SEARCH_RELEVANCE_CANDIDATES", default=1000
+)
+# Number of rows read from the database at a time when streaming search
+# result exports
+EXPORT_CHUNK_SIZE: int = env.int("EXPORT_CHUNK_SIZE", default=2000)
+# Searches the query planner estimates to match at least this many documents
+# report the estimate as their total instead of running a COUNT, 0 disables
+# estimates
+SEARCH_COUNT_ESTIMATE_THRESHOLD: int = env.int(
+    "SEARCH_COUNT_ESTIMATE_THRESHOLD", default=0
+)
+# Largest number of edits corrected in each word when suggesting a spelling
+# correction for a search with no results
+SEARCH_SPELLING_MAX_EDIT_DISTANCE: int = env.int(
+    "SEARCH_SPELLING_MAX_EDIT_DISTANCE", default=2
+)
+# Default and maximum number of completions returned by the suggest endpoint
+SEARCH_SUGGEST_LIMIT: int = env.int("SEARCH_SUGGEST_LIMIT", default=10)
+SEARCH_SUGGEST_MAX_LIMIT: int = env.int("SEARCH_SUGGEST_MAX_LIMIT", default=50)
+# Time in seconds clients and proxies may cache the completions of a prefix
+SEARCH_SUGGEST_CACHE_TIMEOUT: int = env.int(
+    "SEARCH_SUGGEST_CACHE_TIMEOUT", default=60 * 15
+)
+
+# Ingest
+# Number of documents validated and written per bulk INSERT when rebuilding
+# the cache
+INGEST_BATCH_SIZE: int = env.int("INGEST_BATCH_SIZE", default=1000)
+# Number of bytes of the public gateway response read at a time, documents
+# are decoded from the response as it streams in
+INGEST_CHUNK_SIZE: int = env.int("INGEST_CHUNK_SIZE", default=64 * 1024)
+# Directory holding the last public gateway download and its ETag,
+# Last-Modified and content hash, for conditional fetches and offline
+# rebuilds
+GATEWAY_SNAPSHOT_DIR: str = env(
+    "GATEWAY_SNAPSHOT_DIR", default=str(BASE_DIR / ".gateway_snapshot")
+)
+# Ingests that change more than this fraction of the stored documents load
+# the whole dataset into a staging table and swap it in, rather than
+# updating the changed documents in place
+INGEST_MAX_CHANGE_RATIO: float = env.float(
+    "INGEST_MAX_CHANGE_RATIO", default=0.5
+)
+# Ingests where more than this fraction of the documents failed to load
+# are not kept, the stored documents are left as they were
+INGEST_MAX_FAILURE_RATIO: float = env.float(
+    "INGEST_MAX_FAILURE_RATIO", default=0.1
+)
+
 # Cookies
 ANALYTICS_CONSENT_NAME: str = "analytics_consent"
 
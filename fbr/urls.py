@@ -9,13 +9,17 @@ from rest_framework.response import Response
 from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
+from django.utils.cache import patch_cache_control
 
 import app.core.views as core_views
+import app.search.utils.export as search_export
+import app.search.utils.search as search_utils
 import app.search.views as search_views
 
 from app.cache.manage_cache import rebuild_cache
 from app.search.utils.documents import document_type_groups
-from app.search.utils.search import get_publisher_names, search
+from app.search.utils.facets import get_facets
+from app.search.utils.suggest import suggest
 
 urls_logger = logging.getLogger(__name__)
 
@@ -28,7 +32,7 @@ class DataResponseViewSet(viewsets.ViewSet):
         }
 
         try:
-            response_data = search(context, request)
+            response_data = search_utils.search(context, request)
 
             # Create a json object from context but exclude paginator
             response_data = {
@@ -36,10 +40,15 @@ class DataResponseViewSet(viewsets.ViewSet):
                 "results_count": response_data["results_count"],
                 "is_paginated": response_data["is_paginated"],
                 "results_total_count": response_data["results_total_count"],
+                "is_estimate": response_data["is_estimate"],
+                "results_capped": response_data["results_capped"],
+                "suggested_query": response_data["suggested_query"],
                 "results_page_total": response_data["results_page_total"],
                 "current_page": response_data["current_page"],
                 "start_index": response_data["start_index"],
                 "end_index": response_data["end_index"],
+                "next": response_data["next_cursor"],
+                "prev": response_data["prev_cursor"],
             }
 
             # Return the response
@@ -50,6 +59,87 @@ class DataResponseViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request, *args, **kwargs):
+        context = {
+            "service_name": settings.SERVICE_NAME,
+        }
+
+        # Not "format", which selects a DRF renderer
+        export_format = request.GET.get(
+            "export_format", search_export.EXPORT_NDJSON
+        )
+        if export_format not in search_export.EXPORT_FORMATS:
+            return Response(
+                data={
+                    "message": f"export_format must be one of "
+                    f"{', '.join(search_export.EXPORT_FORMATS)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            # Every result matching the search, streamed in one response
+            results = search_utils.search(
+                context, request, ignore_pagination=True
+            )
+            return search_export.export_response(results, export_format)
+        except Exception as e:
+            return Response(
+                data={"message": f"error exporting search results: {e}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="facets")
+    def facets(self, request, *args, **kwargs):
+        try:
+            config = search_utils.get_search_config(request)
+            config.print_to_log("facets")
+
+            # Counts per document type, document type group and publisher
+            # for the search query and filters
+            return Response(get_facets(config), status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response(
+                data={"message": f"error counting search facets: {e}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="suggest")
+    def suggest(self, request, *args, **kwargs):
+        prefix = request.GET.get("query", "")
+        try:
+            limit = min(
+                int(request.GET.get("limit", settings.SEARCH_SUGGEST_LIMIT)),
+                settings.SEARCH_SUGGEST_MAX_LIMIT,
+            )
+        except ValueError:
+            return Response(
+                data={"message": "limit must be a whole number"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            # Completions of the prefix from the suggestion index
+            response = Response(
+                data={"results": suggest(prefix, limit)},
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return Response(
+                data={"message": f"error fetching suggestions: {e}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Completions only change with the dataset, so each prefix can be
+        # cached by browsers and proxies
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.SEARCH_SUGGEST_CACHE_TIMEOUT,
+        )
+        return response
+
 
 class DocumentTypesViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["get"], url_path="document-types")
@@ -78,7 +168,7 @@ class PublishersViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["get"], url_path="publishers")
     def publishers(self, request, *args, **kwargs):
         try:
-            publishers = get_publisher_names()
+            publishers = search_utils.get_publisher_names()
 
             results = [
                 {
@@ -126,7 +216,10 @@ class CacheViewSet(viewsets.ViewSet):
             rebuild or an error message in case of failure.
         """
         try:
-            cache_result = rebuild_cache()
+            # Rebuild from the stored public gateway snapshot, without
+            # fetching
+            offline = request.query_params.get("offline") == "true"
+            cache_result = rebuild_cache(offline=offline)
 
             return Response(cache_result, status=status.HTTP_200_OK)
         except Exception as e: